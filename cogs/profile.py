@@ -9,13 +9,17 @@ functionality defined in the core modules.
 
 from __future__ import annotations
 
+import asyncio
+import functools
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from typing import Optional, List
+from typing import Any, Awaitable, Callable, Optional, List
 
 from core import db, spotify
+from core.util import TTLCache
 
 # Valid badges that can be assigned to favourite artists. Exposed for
 # autocomplete and validation. The badge 'Shiny' refers to the highest
@@ -31,6 +35,12 @@ BADGES = [
     "Shiny",
 ]
 
+# Choice objects for the badge parameters, built once at import. discord.py
+# wants a list per command, so each decorator gets list(_BADGE_CHOICES).
+_BADGE_CHOICES: tuple[app_commands.Choice[str], ...] = tuple(
+    app_commands.Choice(name=b, value=b) for b in BADGES
+)
+
 # Mapping of badges to their display emojis.
 BADGE_EMOJIS = {
     "Bronze": "🟫",
@@ -44,220 +54,287 @@ BADGE_EMOJIS = {
 }
 
 
-class MoveEpicView(discord.ui.View):
-    """Simple UI view offering buttons to move an Epic up or down."""
+# Quiet period before a live Spotify autocomplete search is sent. A newer
+# keystroke from the same user within this window cancels the older request.
+SPOTIFY_DEBOUNCE_SECONDS = 0.15
+# Upper bound for the Spotify request itself. Discord drops autocomplete
+# responses after 3 s, so a slow search is abandoned and yields no choices.
+SPOTIFY_AUTOCOMPLETE_TIMEOUT = 1.5
+
+# Sentinel distinguishing "not cached" from a cached ``None`` username
+_MISSING = object()
+
+# Statements for MoveView, move_*_to and the sort commands are built once
+# at import. Keeping each one as a single string means every caller hits the
+# same entry in the connection's prepared statement cache.
+
+
+def _move_sql(table: str, key: str) -> str:
+    """Return the single-statement move for ``table``.
+
+    Parameters are ``?1`` user_id, ``?2`` requested position and the row's
+    key columns from ``?3`` on, as used in ``key``. The target position is
+    clamped to ``1..MAX(position)``, the rows between the old and new place
+    shift by one and the moved row takes the target. ``RETURNING`` yields
+    the moved row's new position in ``moved`` (``NULL`` for the shifted
+    rows), so no row with a value means the entry does not exist.
+    """
+    return f"""
+    WITH cur AS (
+        SELECT COALESCE(position, 1) AS old,
+               MIN(MAX(?2, 1), (SELECT COALESCE(MAX(position), 1) FROM {table} WHERE user_id=?1)) AS new
+        FROM {table}
+        WHERE user_id=?1 AND {key}
+    )
+    UPDATE {table}
+    SET position = CASE
+        WHEN {key} THEN (SELECT new FROM cur)
+        WHEN (SELECT new FROM cur) < (SELECT old FROM cur) THEN position + 1
+        WHEN (SELECT new FROM cur) > (SELECT old FROM cur) THEN position - 1
+        ELSE position
+    END
+    WHERE user_id=?1
+      AND ({key}
+           OR position BETWEEN MIN((SELECT old FROM cur), (SELECT new FROM cur))
+                           AND MAX((SELECT old FROM cur), (SELECT new FROM cur)))
+    RETURNING CASE WHEN {key} THEN position END AS moved
+    """
+
+
+_SQL_MOVE_EPIC = _move_sql("user_epics", "track_id=?3 AND epic_number=?4")
+_SQL_MOVE_ARTIST = _move_sql("user_fav_artists", "artist_id=?3")
+_SQL_MOVE_WISH = _move_sql("user_wishlist_epics", "track_id=?3")
+# The no-op DO UPDATE (instead of DO NOTHING) makes RETURNING yield the id of
+# an existing artist too, without touching its stored spelling.
+_SQL_UPSERT_ARTIST = """
+    INSERT INTO artists(name) VALUES(?)
+    ON CONFLICT(name) DO UPDATE SET name=artists.name
+    RETURNING artist_id
+"""
 
-    def __init__(self, cog: "ProfileCog", user_id: str, track_id: str, epic_number: int) -> None:
-        super().__init__()
-        self.cog = cog
-        self.user_id = user_id
-        self.track_id = track_id
-        self.epic_number = epic_number
 
-    async def _get_position(self) -> int:
-        row = await db.fetch_one(
-            "SELECT position FROM user_epics WHERE user_id=? AND track_id=? AND epic_number=?",
-            (self.user_id, self.track_id, self.epic_number),
-        )
-        return row["position"] if row else 0
+def _sort_sql(table: str, alias: str, keys: tuple[str, ...], join: str, order: str) -> str:
+    """Return a statement renumbering a user's ``table`` rows in ``order``.
+
+    ``?1`` is the user_id. The positions come from ``ROW_NUMBER()`` over the
+    ordered rows and are written back with ``UPDATE ... FROM`` matched on
+    ``keys``, so a sort is one statement whatever the size of the list.
+    """
+    cols = ", ".join(f"{alias}.{k}" for k in keys)
+    match = " AND ".join(f"{table}.{k} = x.{k}" for k in keys)
+    return f"""
+    UPDATE {table}
+    SET position = x.rn
+    FROM (
+        SELECT {cols}, ROW_NUMBER() OVER (ORDER BY {order}) AS rn
+        FROM {table} {alias}
+        {join}
+        WHERE {alias}.user_id=?1
+    ) AS x
+    WHERE {table}.user_id=?1 AND {match}
+    """
+
+
+_SQL_SORT_EPICS_BY_NAME = _sort_sql(
+    "user_epics",
+    "ue",
+    ("track_id", "epic_number"),
+    "JOIN tracks t ON t.track_id = ue.track_id",
+    "t.artist_name COLLATE NOCASE, t.title COLLATE NOCASE, ue.epic_number ASC",
+)
+_SQL_SORT_WISHES_BY_NAME = _sort_sql(
+    "user_wishlist_epics",
+    "uw",
+    ("track_id",),
+    "JOIN tracks t ON t.track_id = uw.track_id",
+    "t.artist_name COLLATE NOCASE, t.title COLLATE NOCASE",
+)
+_SQL_SORT_ARTISTS_BY_NAME = _sort_sql(
+    "user_fav_artists",
+    "ufa",
+    ("artist_id",),
+    "JOIN artists a ON a.artist_id = ufa.artist_id",
+    "a.name COLLATE NOCASE",
+)
+_SQL_SORT_ARTISTS_BY_BADGE = _sort_sql(
+    "user_fav_artists",
+    "ufa",
+    ("artist_id",),
+    "JOIN artists a ON a.artist_id = ufa.artist_id",
+    """CASE ufa.badge
+        WHEN 'Shiny' THEN 7
+        WHEN 'VIP' THEN 6
+        WHEN 'Legendary' THEN 5
+        WHEN 'Diamond' THEN 4
+        WHEN 'Platinum' THEN 3
+        WHEN 'Gold' THEN 2
+        WHEN 'Silver' THEN 1
+        WHEN 'Bronze' THEN 0
+        ELSE -1
+    END DESC,
+    a.name COLLATE NOCASE""",
+)
+# An entry and its direct neighbours (?1 user_id, ?2 the entry's key), for
+# MoveView's three-line preview
+_SQL_EPIC_WINDOW = """
+    SELECT ue.position, ue.track_id = ?2 AS is_current,
+           t.artist_name || ' – ' || t.title || ' #' || ue.epic_number AS line
+    FROM user_epics ue
+    JOIN tracks t ON t.track_id = ue.track_id
+    WHERE ue.user_id=?1 AND ue.position BETWEEN
+        (SELECT position FROM user_epics WHERE user_id=?1 AND track_id=?2) - 1
+        AND (SELECT position FROM user_epics WHERE user_id=?1 AND track_id=?2) + 1
+"""
+_SQL_ARTIST_WINDOW = """
+    SELECT ufa.position, ufa.artist_id = ?2 AS is_current, a.name AS line
+    FROM user_fav_artists ufa
+    JOIN artists a ON a.artist_id = ufa.artist_id
+    WHERE ufa.user_id=?1 AND ufa.position BETWEEN
+        (SELECT position FROM user_fav_artists WHERE user_id=?1 AND artist_id=?2) - 1
+        AND (SELECT position FROM user_fav_artists WHERE user_id=?1 AND artist_id=?2) + 1
+"""
+_SQL_WISH_WINDOW = """
+    SELECT uwe.position, uwe.track_id = ?2 AS is_current,
+           t.artist_name || ' – ' || t.title AS line
+    FROM user_wishlist_epics uwe
+    JOIN tracks t ON t.track_id = uwe.track_id
+    WHERE uwe.user_id=?1 AND uwe.position BETWEEN
+        (SELECT position FROM user_wishlist_epics WHERE user_id=?1 AND track_id=?2) - 1
+        AND (SELECT position FROM user_wishlist_epics WHERE user_id=?1 AND track_id=?2) + 1
+"""
 
-    async def _render(self) -> str:
-        row = await db.fetch_one(
-            """
-            SELECT ue.position, ue.epic_number, t.title, t.artist_name
-            FROM user_epics ue
-            JOIN tracks t ON t.track_id = ue.track_id
-            WHERE ue.user_id=? AND ue.track_id=? AND ue.epic_number=?
-            """,
-            (self.user_id, self.track_id, self.epic_number),
-        )
-        if not row:
-            return "Epic not found."
-        pos = row["position"]
-        current = f"{row['artist_name']} – {row['title']} #{row['epic_number']}"
-        above_row = await db.fetch_one(
-            """
-            SELECT ue.epic_number, t.title, t.artist_name
-            FROM user_epics ue
-            JOIN tracks t ON t.track_id = ue.track_id
-            WHERE ue.user_id=? AND ue.position=?
-            """,
-            (self.user_id, pos - 1),
-        )
-        below_row = await db.fetch_one(
-            """
-            SELECT ue.epic_number, t.title, t.artist_name
-            FROM user_epics ue
-            JOIN tracks t ON t.track_id = ue.track_id
-            WHERE ue.user_id=? AND ue.position=?
-            """,
-            (self.user_id, pos + 1),
-        )
-        above = (
-            f"{above_row['artist_name']} – {above_row['title']} #{above_row['epic_number']}"
-            if above_row
-            else "—"
-        )
-        below = (
-            f"{below_row['artist_name']} – {below_row['title']} #{below_row['epic_number']}"
-            if below_row
-            else "—"
-        )
-        return f"{pos-1}. {above}\n{pos}. **{current}**\n{pos+1}. {below}"
 
-    @discord.ui.button(emoji="⬆️", style=discord.ButtonStyle.secondary)
-    async def move_up(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_epic_to(self.user_id, self.track_id, self.epic_number, pos - 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
+def _fts_prefix_query(term: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix.
 
-    @discord.ui.button(emoji="⬇️", style=discord.ButtonStyle.secondary)
-    async def move_down(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_epic_to(self.user_id, self.track_id, self.epic_number, pos + 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
+    Each whitespace separated word is quoted (so FTS5 operators typed by the
+    user are treated literally) and suffixed with ``*``. Returns an empty
+    string if ``term`` contains no words.
+    """
+    words = term.split()
+    return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
 
 
-class MoveArtistView(discord.ui.View):
-    """UI view to move a favorite artist up or down."""
+def _like_pattern(current: str | None) -> str | None:
+    """Return the ``LIKE`` substring pattern for an autocomplete input.
 
-    def __init__(self, cog: "ProfileCog", user_id: str, artist_id: int) -> None:
-        super().__init__()
-        self.cog = cog
-        self.user_id = user_id
-        self.artist_id = artist_id
+    The input is stripped once here; ``None`` means there is nothing to
+    filter on. ``%``, ``_`` and ``\\`` are escaped so they match literally;
+    queries using the pattern must say ``ESCAPE '\\'``.
+    """
+    term = (current or "").strip()
+    if not term:
+        return None
+    term = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{term}%"
 
-    async def _get_position(self) -> int:
-        row = await db.fetch_one(
-            "SELECT position FROM user_fav_artists WHERE user_id=? AND artist_id=?",
-            (self.user_id, self.artist_id),
-        )
-        return row["position"] if row else 0
 
-    async def _render(self) -> str:
-        row = await db.fetch_one(
-            """
-            SELECT ufa.position, a.name
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=? AND ufa.artist_id=?
-            """,
-            (self.user_id, self.artist_id),
-        )
-        if not row:
-            return "Artist not found."
-        pos = row["position"]
-        current = row["name"]
-        above_row = await db.fetch_one(
-            """
-            SELECT a.name
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=? AND ufa.position=?
-            """,
-            (self.user_id, pos - 1),
-        )
-        below_row = await db.fetch_one(
-            """
-            SELECT a.name
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=? AND ufa.position=?
-            """,
-            (self.user_id, pos + 1),
+def _cached_autocomplete(func):
+    """Cache an autocomplete helper's choices for a short while.
+
+    Discord fires an autocomplete request per keystroke, often repeating the
+    same input. Results are keyed by helper, user, the user's list version
+    (see :meth:`ProfileCog._touch_lists`) and the stripped input, so a write
+    to the user's lists makes older entries unreachable.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self: "ProfileCog", interaction: discord.Interaction, current: str):
+        user_id = str(interaction.user.id)
+        key = (
+            func.__name__,
+            user_id,
+            self._list_versions.get(user_id, 0),
+            (current or "").strip(),
         )
-        above = above_row["name"] if above_row else "—"
-        below = below_row["name"] if below_row else "—"
-        return f"{pos-1}. {above}\n{pos}. **{current}**\n{pos+1}. {below}"
+        choices = self._autocomplete_cache.get(key)
+        if choices is None:
+            choices = await func(self, interaction, current)
+            self._autocomplete_cache.set(key, choices)
+        return choices
+
+    return wrapper
+
+
+def _current_spotify(interaction: discord.Interaction) -> discord.Spotify | None:
+    """Return the invoking user's visible Spotify activity, if any.
+
+    Slash command interactions may provide a bare User without cached presence
+    data, so the Member object is looked up in the guild cache first.
+    """
+    member = getattr(interaction, "user", None)
+    if getattr(interaction, "guild", None):
+        member = interaction.guild.get_member(interaction.user.id) or interaction.user
+    return next(
+        (a for a in getattr(member, "activities", []) if isinstance(a, discord.Spotify)),
+        None,
+    )
 
-    @discord.ui.button(emoji="⬆️", style=discord.ButtonStyle.secondary)
-    async def move_up(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_artist_to(self.user_id, self.artist_id, pos - 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
 
-    @discord.ui.button(emoji="⬇️", style=discord.ButtonStyle.secondary)
-    async def move_down(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_artist_to(self.user_id, self.artist_id, pos + 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
+def _render_window(rows: list, missing: str) -> tuple[int | None, str]:
+    """Render the three-line move preview from ``_SQL_*_WINDOW`` rows.
+
+    Returns the entry's position (``None`` if it is gone) and the text.
+    """
+    current = next((r for r in rows if r["is_current"]), None)
+    if current is None:
+        return None, missing
+    pos = current["position"]
+    lines = {r["position"]: r["line"] for r in rows}
+    above = lines.get(pos - 1, "—")
+    below = lines.get(pos + 1, "—")
+    return pos, f"{pos-1}. {above}\n{pos}. **{current['line']}**\n{pos+1}. {below}"
+
 
+class MoveView(discord.ui.View):
+    """UI view to move an Epic, a favourite artist or a wish up or down.
 
-class MoveWishView(discord.ui.View):
-    """UI view to move a wishlist entry up or down."""
+    ``key`` identifies the entry: the track_id for Epics and wishes, the
+    artist_id for artists. ``window_sql`` is the matching ``_SQL_*_WINDOW``
+    statement and ``move(user_id, key, new_pos)`` moves the entry and returns
+    its new position; ``missing`` is shown once the entry is gone. Every
+    click is written straight away, so the list is never out of date.
+    """
 
-    def __init__(self, cog: "ProfileCog", user_id: str, track_id: str) -> None:
+    def __init__(
+        self,
+        cog: "ProfileCog",
+        user_id: str,
+        key: int | str,
+        window_sql: str,
+        move: Callable[[str, Any, int], Awaitable[int]],
+        missing: str,
+    ) -> None:
         super().__init__()
         self.cog = cog
         self.user_id = user_id
-        self.track_id = track_id
-
-    async def _get_position(self) -> int:
-        row = await db.fetch_one(
-            "SELECT position FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
-            (self.user_id, self.track_id),
-        )
-        return row["position"] if row else 0
+        self.key = key
+        self.window_sql = window_sql
+        self.move = move
+        self.missing = missing
+        self.pos: int | None = None  # position as of the last render or move
 
     async def _render(self) -> str:
-        row = await db.fetch_one(
-            """
-            SELECT uwe.position, t.title, t.artist_name
-            FROM user_wishlist_epics uwe
-            JOIN tracks t ON t.track_id = uwe.track_id
-            WHERE uwe.user_id=? AND uwe.track_id=?
-            """,
-            (self.user_id, self.track_id),
-        )
-        if not row:
-            return "Wish not found."
-        pos = row["position"]
-        current = f"{row['artist_name']} – {row['title']}"
-        above_row = await db.fetch_one(
-            """
-            SELECT t.title, t.artist_name
-            FROM user_wishlist_epics uwe
-            JOIN tracks t ON t.track_id = uwe.track_id
-            WHERE uwe.user_id=? AND uwe.position=?
-            """,
-            (self.user_id, pos - 1),
-        )
-        below_row = await db.fetch_one(
-            """
-            SELECT t.title, t.artist_name
-            FROM user_wishlist_epics uwe
-            JOIN tracks t ON t.track_id = uwe.track_id
-            WHERE uwe.user_id=? AND uwe.position=?
-            """,
-            (self.user_id, pos + 1),
-        )
-        above = (
-            f"{above_row['artist_name']} – {above_row['title']}" if above_row else "—"
-        )
-        below = (
-            f"{below_row['artist_name']} – {below_row['title']}" if below_row else "—"
-        )
-        return f"{pos-1}. {above}\n{pos}. **{current}**\n{pos+1}. {below}"
+        rows = await db.fetch_all(self.window_sql, (self.user_id, self.key))
+        self.pos, content = _render_window(rows, self.missing)
+        return content
+
+    async def _move(self, interaction: discord.Interaction, offset: int) -> None:
+        if self.pos is not None:
+            try:
+                self.pos = await self.move(self.user_id, self.key, self.pos + offset)
+            except ValueError:
+                self.pos = None
+        content = await self._render()
+        await interaction.response.edit_message(content=content, view=self)
 
     @discord.ui.button(emoji="⬆️", style=discord.ButtonStyle.secondary)
     async def move_up(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_wish_to(self.user_id, self.track_id, pos - 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
+        await self._move(interaction, -1)
 
     @discord.ui.button(emoji="⬇️", style=discord.ButtonStyle.secondary)
     async def move_down(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        pos = await self._get_position()
-        await self.cog.move_wish_to(self.user_id, self.track_id, pos + 1)
-        content = await self._render()
-        await interaction.response.edit_message(content=content, view=self)
-
-
+        await self._move(interaction, 1)
 
 
 class ProfileCog(commands.Cog):
@@ -265,6 +342,93 @@ class ProfileCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        # In-game usernames shown by /profile. Only /username and /delusername
+        # change them, and both refresh the entry.
+        self._usernames: TTLCache[str, str | None] = TTLCache(maxsize=4096, ttl=60)
+        # Autocomplete results and the per-user list versions keying them
+        self._autocomplete_cache: TTLCache[tuple, list] = TTLCache(maxsize=2048, ttl=30)
+        self._list_versions: dict[str, int] = {}
+        # Live Spotify autocomplete: results per (kind, lowercased input) and
+        # the latest pending request per (kind, Discord user)
+        self._spotify_cache: TTLCache[tuple[str, str], list] = TTLCache(maxsize=1024, ttl=60)
+        self._spotify_inflight: dict[tuple[str, int], asyncio.Task] = {}
+        # (canonical name, artist_id) per lowercased artist input, for names
+        # Spotify confirmed. Artist rows are never deleted, so an entry only
+        # expires to pick up renames.
+        self._artists: TTLCache[str, tuple[str, int]] = TTLCache(maxsize=4096, ttl=3600)
+        # Users whose row is known to exist, see ensure_user. Bounded so a
+        # large guild cannot grow it without limit; user rows are never
+        # deleted, so the long TTL only matters for eviction order.
+        self._known_users: TTLCache[str, bool] = TTLCache(maxsize=10000, ttl=86400)
+
+    async def _spotify_search(
+        self,
+        kind: str,
+        interaction: discord.Interaction,
+        term: str,
+        search: Callable[[str], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        """Run a debounced, cached live Spotify search for autocomplete.
+
+        Identical inputs within a minute are answered from memory. Otherwise
+        the search waits :data:`SPOTIFY_DEBOUNCE_SECONDS` first; if the same
+        user types again meanwhile, this (now stale) request is cancelled.
+        Searches that fail or exceed :data:`SPOTIFY_AUTOCOMPLETE_TIMEOUT`
+        yield an empty list and are not cached.
+        """
+        key = (kind, term.lower())
+        cached = self._spotify_cache.get(key)
+        if cached is not None:
+            return cached
+        slot = (kind, interaction.user.id)
+        previous = self._spotify_inflight.get(slot)
+        if previous is not None and not previous.done():
+            previous.cancel()
+        task = asyncio.current_task()
+        self._spotify_inflight[slot] = task
+        try:
+            await asyncio.sleep(SPOTIFY_DEBOUNCE_SECONDS)
+            results = await asyncio.wait_for(search(term), SPOTIFY_AUTOCOMPLETE_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return []
+        finally:
+            if self._spotify_inflight.get(slot) is task:
+                del self._spotify_inflight[slot]
+        self._spotify_cache.set(key, results)
+        return results
+
+    def _touch_lists(self, user_id: str) -> None:
+        """Mark the user's epics, wishes and artists as changed.
+
+        Cached autocomplete results for the user are bypassed from now on.
+        """
+        self._list_versions[user_id] = self._list_versions.get(user_id, 0) + 1
+
+    async def _resolve_artist(self, raw: str, *, trust_raw: bool = False) -> tuple[str, int] | None:
+        """Return ``(canonical name, artist_id)`` for a typed artist name.
+
+        The name is canonicalised via Spotify and upserted. With ``trust_raw``
+        an artist Spotify does not know is stored under ``raw``; without it
+        ``None`` is returned. Only Spotify-confirmed results are memoised per
+        input, so a raw name stored by ``trust_raw`` is never accepted later
+        without it.
+        """
+        key = raw.strip().lower()
+        cached = self._artists.get(key)
+        if cached is not None:
+            return cached
+        sp = await spotify.get_canonical_artist(raw)
+        name = sp["name"] if sp else raw
+        if not sp and not trust_raw:
+            return None
+        row = await db.fetch_one(_SQL_UPSERT_ARTIST, (name,))
+        resolved = (name, row["artist_id"])
+        if sp:
+            self._artists.set(key, resolved)
+            self._artists.set(name.lower(), resolved)
+        return resolved
 
     # --- Response helpers ----------------------------------------------------
     async def _safe_defer(self, interaction: discord.Interaction, *, ephemeral: bool = True) -> None:
@@ -301,17 +465,28 @@ class ProfileCog(commands.Cog):
 
     # Helper method to ensure a user row exists
     async def ensure_user(self, user_id: str) -> None:
+        """Create the user's row unless this process has already seen it.
+
+        User rows are never deleted, so a user is remembered once the insert
+        has committed. Call this outside of :func:`db.transaction` blocks so
+        that a rolled-back transaction cannot leave a remembered user without
+        a row.
+        """
+        if self._known_users.get(user_id):
+            return
         await db.execute(
             "INSERT INTO users(user_id) VALUES(?) ON CONFLICT DO NOTHING",
             (user_id,),
         )
+        self._known_users.set(user_id, True)
 
     async def _bump_positions(self, table: str, user_id: str) -> int:
         """Increment positions for all rows of a user in ``table`` and return 1.
 
         This helper is used to insert new entries at the top of a user's
-        collection by shifting existing ones down. ``table`` must be one of the
-        known profile tables and is therefore trusted.
+        collection by shifting existing ones down. Rows inserted at position 0
+        beforehand end up at position 1. ``table`` must be one of the known
+        profile tables and is therefore trusted.
         """
         await db.execute(
             f"UPDATE {table} SET position = position + 1 WHERE user_id=?",
@@ -331,197 +506,92 @@ class ProfileCog(commands.Cog):
         """Return the position for a new wishlist entry (top of the list)."""
         return await self._bump_positions("user_wishlist_epics", user_id)
 
-    async def move_epic_to(self, user_id: str, track_id: str, epic_number: int, new_pos: int) -> None:
-        """Reposition an Epic in manual ordering, adjusting other positions accordingly."""
-        # Fetch the current position
-        row = await db.fetch_one(
-            "SELECT position FROM user_epics WHERE user_id=? AND track_id=? AND epic_number=?",
-            (user_id, track_id, epic_number),
-        )
-        if row is None:
-            raise ValueError("Epic not found for this user.")
-        old_pos = row["position"] or 1
-        if new_pos < 1:
-            new_pos = 1
-        # Determine the maximum position to bound moves
-        max_row = await db.fetch_one(
-            "SELECT COALESCE(MAX(position), 0) AS maxp FROM user_epics WHERE user_id=?",
-            (user_id,),
-        )
-        max_pos = max_row["maxp"] or 1
-        if new_pos > max_pos:
-            new_pos = max_pos
-        if old_pos == new_pos:
-            return
-        async with db.transaction():
-            if new_pos < old_pos:
-                # Shift down: increment positions in [new_pos, old_pos-1]
-                await db.execute(
-                    """
-                    UPDATE user_epics
-                    SET position = position + 1
-                    WHERE user_id=? AND position >= ? AND position < ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            else:
-                # Shift up: decrement positions in [old_pos+1, new_pos]
-                await db.execute(
-                    """
-                    UPDATE user_epics
-                    SET position = position - 1
-                    WHERE user_id=? AND position <= ? AND position > ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            # Set new position for the moved Epic
-            await db.execute(
-                """
-                UPDATE user_epics
-                SET position=?
-                WHERE user_id=? AND track_id=? AND epic_number=?
-                """,
-                (new_pos, user_id, track_id, epic_number),
-            )
+    async def _move_row(self, sql: str, params: tuple, missing: str) -> int:
+        """Run one of the ``_SQL_MOVE_*`` statements and return the new position.
 
-    async def move_artist_to(self, user_id: str, artist_id: int, new_pos: int) -> None:
-        row = await db.fetch_one(
-            "SELECT position FROM user_fav_artists WHERE user_id=? AND artist_id=?",
-            (user_id, artist_id),
-        )
-        if row is None:
-            raise ValueError("Artist not found for this user.")
-        old_pos = row["position"] or 1
-        if new_pos < 1:
-            new_pos = 1
-        max_row = await db.fetch_one(
-            "SELECT COALESCE(MAX(position),0) AS maxp FROM user_fav_artists WHERE user_id=?",
-            (user_id,),
+        ``params`` are the statement's ``?1``... values. Raises ValueError
+        with ``missing`` if the entry does not exist.
+        """
+        rows = await db.fetch_all(sql, params)
+        moved = next((r["moved"] for r in rows if r["moved"] is not None), None)
+        if moved is None:
+            raise ValueError(missing)
+        self._touch_lists(params[0])
+        return moved
+
+    async def move_epic_to(self, user_id: str, track_id: str, epic_number: int, new_pos: int) -> int:
+        """Reposition an Epic in manual ordering, adjusting other positions accordingly.
+
+        Returns the Epic's (clamped) new position.
+        """
+        return await self._move_row(
+            _SQL_MOVE_EPIC, (user_id, new_pos, track_id, epic_number), "Epic not found for this user."
         )
-        max_pos = max_row["maxp"] or 1
-        if new_pos > max_pos:
-            new_pos = max_pos
-        if old_pos == new_pos:
-            return
-        async with db.transaction():
-            if new_pos < old_pos:
-                await db.execute(
-                    """
-                    UPDATE user_fav_artists
-                    SET position = position + 1
-                    WHERE user_id=? AND position >= ? AND position < ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            else:
-                await db.execute(
-                    """
-                    UPDATE user_fav_artists
-                    SET position = position - 1
-                    WHERE user_id=? AND position <= ? AND position > ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            await db.execute(
-                """
-                UPDATE user_fav_artists
-                SET position=?
-                WHERE user_id=? AND artist_id=?
-                """,
-                (new_pos, user_id, artist_id),
-            )
 
-    async def move_wish_to(self, user_id: str, track_id: str, new_pos: int) -> None:
-        row = await db.fetch_one(
-            "SELECT position FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
-            (user_id, track_id),
+    async def move_artist_to(self, user_id: str, artist_id: int, new_pos: int) -> int:
+        return await self._move_row(
+            _SQL_MOVE_ARTIST, (user_id, new_pos, artist_id), "Artist not found for this user."
         )
-        if row is None:
-            raise ValueError("Wish not found for this user.")
-        old_pos = row["position"] or 1
-        if new_pos < 1:
-            new_pos = 1
-        max_row = await db.fetch_one(
-            "SELECT COALESCE(MAX(position),0) AS maxp FROM user_wishlist_epics WHERE user_id=?",
-            (user_id,),
+
+    async def move_wish_to(self, user_id: str, track_id: str, new_pos: int) -> int:
+        return await self._move_row(
+            _SQL_MOVE_WISH, (user_id, new_pos, track_id), "Wish not found for this user."
         )
-        max_pos = max_row["maxp"] or 1
-        if new_pos > max_pos:
-            new_pos = max_pos
-        if old_pos == new_pos:
-            return
-        async with db.transaction():
-            if new_pos < old_pos:
-                await db.execute(
-                    """
-                    UPDATE user_wishlist_epics
-                    SET position = position + 1
-                    WHERE user_id=? AND position >= ? AND position < ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            else:
-                await db.execute(
-                    """
-                    UPDATE user_wishlist_epics
-                    SET position = position - 1
-                    WHERE user_id=? AND position <= ? AND position > ?
-                    """,
-                    (user_id, new_pos, old_pos),
-                )
-            await db.execute(
-                """
-                UPDATE user_wishlist_epics
-                SET position=?
-                WHERE user_id=? AND track_id=?
-                """,
-                (new_pos, user_id, track_id),
-            )
 
     # Slash commands
-    # Autocomplete for track selection reused across commands
+    # Autocomplete for track selection reused across commands. Not wrapped in
+    # _cached_autocomplete: its key ignores spotify.tracks_version.
     async def autocomplete_tracks(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        """Autocomplete helper for Spotify tracks stored in the local database."""
+        """Autocomplete helper for Spotify tracks stored in the local database.
+
+        Uses the ``tracks_fts`` full-text index: every typed word is matched as
+        a word prefix in the title or artist name and results are ranked by
+        BM25 relevance. Terms shorter than two characters return nothing: a
+        one-letter prefix matches most of the index and is useless to rank.
+        Results are shared by all users and cached per lowercased input until
+        :func:`spotify.upsert_track` changes the tracks table.
+        """
         term = (current or "").strip()
-        # Build list of suggestions: prefix matches first, then substring
-        suggestions: list[tuple[str, str]] = []
-        if term:
-            # Prefix matches
-            rows = await db.fetch_all(
-                """
-                SELECT track_id, title, artist_name
-                FROM tracks
-                WHERE title LIKE ? OR artist_name LIKE ?
-                ORDER BY artist_name COLLATE NOCASE, title COLLATE NOCASE
-                LIMIT 15
-                """,
-                (term + "%", term + "%"),
+        if len(term) < 2:
+            return []
+        key = ("autocomplete_tracks", spotify.tracks_version, term.lower())
+        choices = self._autocomplete_cache.get(key)
+        if choices is not None:
+            return choices
+        match = _fts_prefix_query(term)
+        if not match:
+            return []
+        rows = await db.read_all(
+            """
+            SELECT track_id, title, artist_name
+            FROM tracks_fts
+            WHERE tracks_fts MATCH ?
+            ORDER BY bm25(tracks_fts)
+            LIMIT 25
+            """,
+            (match,),
+        )
+        choices = [
+            app_commands.Choice(
+                name=f"{r['artist_name']} – {r['title']}"[:100], value=r["track_id"]
             )
-            suggestions += [(r["track_id"], f"{r['artist_name']} – {r['title']}") for r in rows]
-            if len(suggestions) < 25:
-                rows2 = await db.fetch_all(
-                    """
-                    SELECT track_id, title, artist_name
-                    FROM tracks
-                    WHERE (title LIKE ? OR artist_name LIKE ?) AND (title NOT LIKE ? AND artist_name NOT LIKE ?)
-                    ORDER BY artist_name COLLATE NOCASE, title COLLATE NOCASE
-                    LIMIT ?
-                    """,
-                    (f"%{term}%", f"%{term}%", term + "%", term + "%", 25 - len(suggestions)),
-                )
-                suggestions += [(r["track_id"], f"{r['artist_name']} – {r['title']}") for r in rows2]
-        else:
-            suggestions = []
-        return [app_commands.Choice(name=label[:100], value=track_id) for track_id, label in suggestions[:25]]
+            for r in rows
+        ]
+        self._autocomplete_cache.set(key, choices)
+        return choices
 
     # ---------- NEW: Autocomplete tracks via Spotify live ----------
     async def autocomplete_spotify_tracks(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        """Autocomplete helper using live Spotify track search."""
+        """Autocomplete helper using live Spotify track search.
+
+        Terms shorter than two characters are not sent to Spotify.
+        """
         term = (current or "").strip()
-        try:
-            results = await spotify.search_tracks(term, limit=10) if term else []
-        except Exception:
-            results = []
+        if len(term) < 2:
+            return []
+        results = await self._spotify_search(
+            "tracks", interaction, term, lambda q: spotify.search_tracks(q, limit=10)
+        )
         choices = []
         for t in results:
             label = f"{t['artist_name']} – {t['title']}"
@@ -532,34 +602,39 @@ class ProfileCog(commands.Cog):
 
     # ---------- UPDATED: Autocomplete artists via Spotify live ----------
     async def autocomplete_artists(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        """Autocomplete helper for artists using live Spotify search."""
+        """Autocomplete helper for artists using live Spotify search.
+
+        Terms shorter than two characters are not sent to Spotify.
+        """
         term = (current or "").strip()
-        try:
-            results = await spotify.search_artists(term, limit=10) if term else []
-        except Exception:
-            results = []
+        if len(term) < 2:
+            return []
+        results = await self._spotify_search(
+            "artists", interaction, term, lambda q: spotify.search_artists(q, limit=10)
+        )
         # Return the name as the value; the DB insert handles creation
         return [app_commands.Choice(name=a["name"][:100], value=a["name"]) for a in results][:25]
 
     # Autocomplete helper for the user's favourite artists
+    @_cached_autocomplete
     async def autocomplete_fav_artists(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
         """Return favourite artists of the invoking user for autocomplete."""
         user_id = str(interaction.user.id)
-        term = (current or "").strip()
-        if term:
-            rows = await db.fetch_all(
+        pattern = _like_pattern(current)
+        if pattern:
+            rows = await db.read_all(
                 """
                 SELECT a.artist_id, a.name
                 FROM user_fav_artists ufa
                 JOIN artists a ON a.artist_id = ufa.artist_id
-                WHERE ufa.user_id=? AND a.name LIKE ?
+                WHERE ufa.user_id=?1 AND a.name LIKE ?2 ESCAPE '\\'
                 ORDER BY ufa.position ASC
                 LIMIT 25
                 """,
-                (user_id, f"%{term}%"),
+                (user_id, pattern),
             )
         else:
-            rows = await db.fetch_all(
+            rows = await db.read_all(
                 """
                 SELECT a.artist_id, a.name
                 FROM user_fav_artists ufa
@@ -573,26 +648,28 @@ class ProfileCog(commands.Cog):
         return [app_commands.Choice(name=r["name"][:100], value=str(r["artist_id"])) for r in rows]
 
     # Autocomplete helper for tracks the user owns as Epics
+    @_cached_autocomplete
     async def autocomplete_owned_tracks(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Return Epic tracks owned by the invoking user for autocomplete."""
         user_id = str(interaction.user.id)
-        term = (current or "").strip()
-        if term:
-            rows = await db.fetch_all(
+        pattern = _like_pattern(current)
+        if pattern:
+            rows = await db.read_all(
                 """
                 SELECT t.track_id, t.title, t.artist_name
                 FROM user_epics ue
                 JOIN tracks t ON t.track_id = ue.track_id
-                WHERE ue.user_id=? AND (t.title LIKE ? OR t.artist_name LIKE ?)
+                WHERE ue.user_id=?1
+                  AND (t.title LIKE ?2 ESCAPE '\\' OR t.artist_name LIKE ?2 ESCAPE '\\')
                 ORDER BY ue.position ASC
                 LIMIT 25
                 """,
-                (user_id, f"%{term}%", f"%{term}%"),
+                (user_id, pattern),
             )
         else:
-            rows = await db.fetch_all(
+            rows = await db.read_all(
                 """
                 SELECT t.track_id, t.title, t.artist_name
                 FROM user_epics ue
@@ -611,26 +688,28 @@ class ProfileCog(commands.Cog):
         ]
 
     # Autocomplete helper for specific Epics (track + number) the user owns
+    @_cached_autocomplete
     async def autocomplete_owned_epics(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Return Epic entries of the invoking user for autocomplete."""
         user_id = str(interaction.user.id)
-        term = (current or "").strip()
-        if term:
-            rows = await db.fetch_all(
+        pattern = _like_pattern(current)
+        if pattern:
+            rows = await db.read_all(
                 """
                 SELECT ue.track_id, ue.epic_number, t.title, t.artist_name
                 FROM user_epics ue
                 JOIN tracks t ON t.track_id = ue.track_id
-                WHERE ue.user_id=? AND (t.title LIKE ? OR t.artist_name LIKE ?)
+                WHERE ue.user_id=?1
+                  AND (t.title LIKE ?2 ESCAPE '\\' OR t.artist_name LIKE ?2 ESCAPE '\\')
                 ORDER BY ue.position ASC
                 LIMIT 25
                 """,
-                (user_id, f"%{term}%", f"%{term}%"),
+                (user_id, pattern),
             )
         else:
-            rows = await db.fetch_all(
+            rows = await db.read_all(
                 """
                 SELECT ue.track_id, ue.epic_number, t.title, t.artist_name
                 FROM user_epics ue
@@ -650,26 +729,28 @@ class ProfileCog(commands.Cog):
         ]
 
     # Autocomplete helper for tracks on the user's wishlist
+    @_cached_autocomplete
     async def autocomplete_wishlist_tracks(
         self, interaction: discord.Interaction, current: str
     ) -> List[app_commands.Choice[str]]:
         """Return wishlist tracks of the invoking user for autocomplete."""
         user_id = str(interaction.user.id)
-        term = (current or "").strip()
-        if term:
-            rows = await db.fetch_all(
+        pattern = _like_pattern(current)
+        if pattern:
+            rows = await db.read_all(
                 """
                 SELECT t.track_id, t.title, t.artist_name
                 FROM user_wishlist_epics uwe
                 JOIN tracks t ON t.track_id = uwe.track_id
-                WHERE uwe.user_id=? AND (t.title LIKE ? OR t.artist_name LIKE ?)
+                WHERE uwe.user_id=?1
+                  AND (t.title LIKE ?2 ESCAPE '\\' OR t.artist_name LIKE ?2 ESCAPE '\\')
                 ORDER BY uwe.position ASC
                 LIMIT 25
                 """,
-                (user_id, f"%{term}%", f"%{term}%"),
+                (user_id, pattern),
             )
         else:
-            rows = await db.fetch_all(
+            rows = await db.read_all(
                 """
                 SELECT t.track_id, t.title, t.artist_name
                 FROM user_wishlist_epics uwe
@@ -692,11 +773,16 @@ class ProfileCog(commands.Cog):
     async def username(self, interaction: discord.Interaction, name: str) -> None:
         """Set or update the ingame Soundmap username directly."""
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
         name = name.strip()
+        # Create the user row and set the name in a single statement
         await db.execute(
-            "UPDATE users SET username=? WHERE user_id=?", (name, user_id)
+            """
+            INSERT INTO users(user_id, username) VALUES(?,?)
+            ON CONFLICT(user_id) DO UPDATE SET username=excluded.username
+            """,
+            (user_id, name),
         )
+        self._usernames.set(user_id, name)
         await interaction.response.send_message(
             f"✅ Username set: **{name}**", ephemeral=True
         )
@@ -705,10 +791,11 @@ class ProfileCog(commands.Cog):
     async def delusername(self, interaction: discord.Interaction) -> None:
         """Remove the ingame Soundmap username from your profile."""
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
+        # Nothing to clear for unknown users, so no ensure_user round-trip
         await db.execute(
             "UPDATE users SET username=NULL WHERE user_id=?", (user_id,)
         )
+        self._usernames.set(user_id, None)
         await interaction.response.send_message(
             "✅ Username removed", ephemeral=True
         )
@@ -725,47 +812,46 @@ class ProfileCog(commands.Cog):
         self, interaction: discord.Interaction, track: str, epic_number: int
     ) -> None:
         """Add an Epic by selecting a Spotify track via autocomplete."""
+        if epic_number <= 0:
+            await interaction.response.send_message(
+                "Epic number must be > 0.", ephemeral=True
+            )
+            return
+        # The Spotify lookup may take longer than Discord's 3s response window
+        await self._safe_defer(interaction, ephemeral=True)
         try:
             t = await spotify.get_track(track)
         except Exception:
             t = None
         if not t:
-            await interaction.response.send_message(
-                "Song not found.", ephemeral=True
-            )
-            return
-        if epic_number <= 0:
-            await interaction.response.send_message(
-                "Epic number must be > 0.", ephemeral=True
-            )
+            await self._respond(interaction, content="Song not found.")
             return
         user_id = str(interaction.user.id)
         await self.ensure_user(user_id)
-        await spotify.upsert_track(
-            t["track_id"], t["title"], t["artist_name"], t["url"]
-        )
-        exists = await db.fetch_one(
-            """
-            SELECT 1 FROM user_epics WHERE user_id=? AND track_id=?
-            """,
-            (user_id, t["track_id"]),
-        )
-        if exists:
-            await interaction.response.send_message(
-                "You already own an Epic for this song.", ephemeral=True
+        async with db.transaction():
+            await spotify.upsert_track(
+                t["track_id"], t["title"], t["artist_name"], t["url"]
+            )
+            # Insert at position 0; RETURNING yields nothing if the song is
+            # already owned, so no separate existence check is needed.
+            inserted = await db.fetch_one(
+                """
+                INSERT INTO user_epics(user_id, track_id, epic_number, position)
+                VALUES(?,?,?,0)
+                ON CONFLICT(user_id, track_id) DO NOTHING
+                RETURNING position
+                """,
+                (user_id, t["track_id"], epic_number),
             )
+            if inserted is not None:
+                await self.get_next_position(user_id)
+        if inserted is None:
+            await self._respond(interaction, content="You already own an Epic for this song.")
             return
-        next_pos = await self.get_next_position(user_id)
-        await db.execute(
-            """
-            INSERT INTO user_epics(user_id, track_id, epic_number, position)
-            VALUES(?,?,?,?)
-            """,
-            (user_id, t["track_id"], epic_number, next_pos),
-        )
-        await interaction.response.send_message(
-            f"✅ Epic added: **{t['artist_name']} – {t['title']}** (# {epic_number})",
-            ephemeral=True,
+        self._touch_lists(user_id)
+        await self._respond(
+            interaction,
+            content=f"✅ Epic added: **{t['artist_name']} – {t['title']}** (# {epic_number})",
         )
 
     # Command: remove an Epic
@@ -775,37 +861,18 @@ class ProfileCog(commands.Cog):
     @app_commands.autocomplete(track=autocomplete_owned_tracks)
     async def delepic(self, interaction: discord.Interaction, track: str) -> None:
         user_id = str(interaction.user.id)
-        # Check if the epic exists
+        await self._safe_defer(interaction, ephemeral=True)
+        # Later epics move up via the AFTER DELETE trigger; RETURNING tells us
+        # whether the epic existed.
         row = await db.fetch_one(
-            "SELECT position FROM user_epics WHERE user_id=? AND track_id=?",
+            "DELETE FROM user_epics WHERE user_id=? AND track_id=? RETURNING position",
             (user_id, track),
         )
         if not row:
-            await interaction.response.send_message(
-                "You don't own this Epic.",
-                ephemeral=True,
-            )
+            await self._respond(interaction, content="You don't own this Epic.")
             return
-        pos = row["position"] or 1
-        # Remove epic and shift positions
-        async with db.transaction():
-            await db.execute(
-                "DELETE FROM user_epics WHERE user_id=? AND track_id=?",
-                (user_id, track),
-            )
-            # Decrement positions greater than removed
-            await db.execute(
-                """
-                UPDATE user_epics
-                SET position = position - 1
-                WHERE user_id=? AND position > ?
-                """,
-                (user_id, pos),
-            )
-        await interaction.response.send_message(
-            "✅ Epic removed.",
-            ephemeral=True,
-        )
+        self._touch_lists(user_id)
+        await self._respond(interaction, content="✅ Epic removed.")
 
     # Command: add a song to the wishlist via Spotify search
     @app_commands.command(name="addwish", description="Add a song to your wishlist")
@@ -814,35 +881,35 @@ class ProfileCog(commands.Cog):
     @app_commands.autocomplete(track=autocomplete_spotify_tracks)
     async def addwish(self, interaction: discord.Interaction, track: str, note: Optional[str] = None) -> None:
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
+        await self._safe_defer(interaction, ephemeral=True)
         # Fetch track details from Spotify
         try:
             t = await spotify.get_track(track)
         except Exception:
             t = None
         if not t:
-            await interaction.response.send_message("Song not found.", ephemeral=True)
+            await self._respond(interaction, content="Song not found.")
             return
-        await spotify.upsert_track(t["track_id"], t["title"], t["artist_name"], t["url"])
-        # Insert or update wishlist note
-        row = await db.fetch_one(
-            "SELECT 1 FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
-            (user_id, t["track_id"]),
-        )
-        if row:
-            await db.execute(
-                "UPDATE user_wishlist_epics SET note=? WHERE user_id=? AND track_id=?",
-                (note, user_id, t["track_id"]),
-            )
-            msg = "Wishlist note updated."
-        else:
-            next_pos = await self.get_next_wish_position(user_id)
-            await db.execute(
-                "INSERT INTO user_wishlist_epics(user_id, track_id, note, position) VALUES(?,?,?,?)",
-                (user_id, t["track_id"], note, next_pos),
+        await self.ensure_user(user_id)
+        async with db.transaction():
+            await spotify.upsert_track(t["track_id"], t["title"], t["artist_name"], t["url"])
+            # Insert at position 0 or update the note of an existing wish;
+            # the returned position tells the two cases apart.
+            row = await db.fetch_one(
+                """
+                INSERT INTO user_wishlist_epics(user_id, track_id, note, position) VALUES(?,?,?,0)
+                ON CONFLICT(user_id, track_id) DO UPDATE SET note=excluded.note
+                RETURNING position
+                """,
+                (user_id, t["track_id"], note),
             )
-            msg = "✅ Added to wishlist."
-        await interaction.response.send_message(msg, ephemeral=True)
+            if row["position"] == 0:
+                await self.get_next_wish_position(user_id)
+                msg = "✅ Added to wishlist."
+            else:
+                msg = "Wishlist note updated."
+        self._touch_lists(user_id)
+        await self._respond(interaction, content=msg)
 
     # Command: remove from wishlist
     @app_commands.command(name="delwish", description="Remove a song from your wishlist")
@@ -850,33 +917,22 @@ class ProfileCog(commands.Cog):
     @app_commands.autocomplete(track=autocomplete_wishlist_tracks)
     async def delwish(self, interaction: discord.Interaction, track: str) -> None:
         user_id = str(interaction.user.id)
+        await self._safe_defer(interaction, ephemeral=True)
+        # Later wishes move up via the AFTER DELETE trigger
         row = await db.fetch_one(
-            "SELECT position FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
+            "DELETE FROM user_wishlist_epics WHERE user_id=? AND track_id=? RETURNING position",
             (user_id, track),
         )
         if not row:
-            await interaction.response.send_message("This song is not on your wishlist.", ephemeral=True)
+            await self._respond(interaction, content="This song is not on your wishlist.")
             return
-        pos = row["position"] or 1
-        async with db.transaction():
-            await db.execute(
-                "DELETE FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
-                (user_id, track),
-            )
-            await db.execute(
-                """
-                UPDATE user_wishlist_epics
-                SET position = position - 1
-                WHERE user_id=? AND position > ?
-                """,
-                (user_id, pos),
-            )
-        await interaction.response.send_message("✅ Removed from wishlist.", ephemeral=True)
+        self._touch_lists(user_id)
+        await self._respond(interaction, content="✅ Removed from wishlist.")
 
     # ---------- UPDATED: add favourite artist (Spotify validation) ----------
     @app_commands.command(name="addartist", description="Add a favorite artist")
     @app_commands.autocomplete(artist=autocomplete_artists)
-    @app_commands.choices(badge=[app_commands.Choice(name=b, value=b) for b in BADGES])
+    @app_commands.choices(badge=list(_BADGE_CHOICES))
     @app_commands.describe(badge="Which badge you have")
     async def addartist(
         self,
@@ -885,101 +941,66 @@ class ProfileCog(commands.Cog):
         badge: Optional[app_commands.Choice[str]] = None,
     ) -> None:
         user_id = str(interaction.user.id)
+        await self._safe_defer(interaction, ephemeral=True)
         await self.ensure_user(user_id)
 
-        # Spotify-Validierung & Kanonisierung
-        sp = await spotify.get_canonical_artist(artist)
-        if not sp:
-            await interaction.response.send_message("Artist not found on Spotify.", ephemeral=True)
-            return
-        canonical_name = sp["name"]
-
-        # In lokale Tabelle eintragen (unique by name)
-        await db.execute(
-            "INSERT INTO artists(name) VALUES(?) ON CONFLICT(name) DO NOTHING",
-            (canonical_name,),
-        )
-        row = await db.fetch_one("SELECT artist_id FROM artists WHERE name=?", (canonical_name,))
-        if not row:
-            await interaction.response.send_message("Internal error saving artist.", ephemeral=True)
-            return
-        artist_id_int = row["artist_id"]
-
-        # Only shift positions when inserting a brand new favourite
-        exists = await db.fetch_one(
-            "SELECT 1 FROM user_fav_artists WHERE user_id=? AND artist_id=?",
-            (user_id, artist_id_int),
-        )
-        if exists:
-            if badge is not None:
-                await db.execute(
-                    "UPDATE user_fav_artists SET badge=? WHERE user_id=? AND artist_id=?",
-                    (badge.value, user_id, artist_id_int),
-                )
-                msg = f"✅ Favorite artist added: **{canonical_name}** with badge **{badge.value}**."
-            else:
-                msg = f"✅ Favorite artist added: **{canonical_name}**."
-            await interaction.response.send_message(msg, ephemeral=True)
+        # Autocomplete already yields canonical Spotify names, whose lookup
+        # the autocomplete search has cached (see spotify.search_artists).
+        resolved = await self._resolve_artist(artist)
+        if resolved is None:
+            await self._respond(interaction, content="Artist not found on Spotify.")
             return
+        canonical_name, artist_id_int = resolved
 
-        next_pos = await self.get_next_artist_position(user_id)
-        if badge is not None:
-            await db.execute(
+        async with db.transaction():
+            # Insert at position 0 or, for an existing favourite, only set the
+            # badge (keeping the old one if none was given); the returned
+            # position tells the two cases apart.
+            row = await db.fetch_one(
                 """
-                INSERT INTO user_fav_artists(user_id, artist_id, badge, position)
-                VALUES(?,?,?,?)
+                INSERT INTO user_fav_artists(user_id, artist_id, badge, position) VALUES(?,?,?,0)
+                ON CONFLICT(user_id, artist_id)
+                DO UPDATE SET badge=COALESCE(excluded.badge, user_fav_artists.badge)
+                RETURNING position
                 """,
-                (user_id, artist_id_int, badge.value, next_pos),
+                (user_id, artist_id_int, badge.value if badge is not None else None),
             )
+            if row["position"] == 0:
+                await self.get_next_artist_position(user_id)
+        self._touch_lists(user_id)
+        if badge is not None:
             msg = f"✅ Favorite artist added: **{canonical_name}** with badge **{badge.value}**."
         else:
-            await db.execute(
-                "INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES(?,?,?)",
-                (user_id, artist_id_int, next_pos),
-            )
             msg = f"✅ Favorite artist added: **{canonical_name}**."
-        await interaction.response.send_message(msg, ephemeral=True)
+        await self._respond(interaction, content=msg)
 
     # ---------- NEW: remove favourite artist ----------
     @app_commands.command(name="delartist", description="Remove a favorite artist")
     @app_commands.autocomplete(artist=autocomplete_fav_artists)
     async def delartist(self, interaction: discord.Interaction, artist: str) -> None:
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
-
+        # Nothing to delete for unknown users, so no ensure_user round-trip
         try:
             artist_id = int(artist)
         except ValueError:
             await interaction.response.send_message("Invalid artist.", ephemeral=True)
             return
 
+        # Later artists move up via the AFTER DELETE trigger; RETURNING tells
+        # us whether the artist was a favourite and what it is called.
         row = await db.fetch_one(
             """
-            SELECT ufa.position, a.name
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=? AND ufa.artist_id=?
+            DELETE FROM user_fav_artists
+            WHERE user_id=? AND artist_id=?
+            RETURNING (SELECT name FROM artists WHERE artist_id = user_fav_artists.artist_id) AS name
             """,
             (user_id, artist_id),
         )
         if not row:
             await interaction.response.send_message("This artist is not in your list.", ephemeral=True)
             return
-        pos = row["position"] or 1
         canonical_name = row["name"]
-        async with db.transaction():
-            await db.execute(
-                "DELETE FROM user_fav_artists WHERE user_id=? AND artist_id=?",
-                (user_id, artist_id),
-            )
-            await db.execute(
-                """
-                UPDATE user_fav_artists
-                SET position = position - 1
-                WHERE user_id=? AND position > ?
-                """,
-                (user_id, pos),
-            )
+        self._touch_lists(user_id)
         await interaction.response.send_message(
             f"✅ Favorite artist removed: **{canonical_name}**.", ephemeral=True
         )
@@ -987,11 +1008,10 @@ class ProfileCog(commands.Cog):
     # Set badge for an already favourited artist
     @app_commands.command(name="setbadge", description="Set your badge for a favorite artist")
     @app_commands.autocomplete(artist=autocomplete_fav_artists)
-    @app_commands.choices(badge=[app_commands.Choice(name=b, value=b) for b in BADGES])
+    @app_commands.choices(badge=list(_BADGE_CHOICES))
     @app_commands.describe(badge="Which badge you have")
     async def setbadge(self, interaction: discord.Interaction, artist: str, badge: app_commands.Choice[str]) -> None:
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
 
         try:
             artist_id = int(artist)
@@ -999,23 +1019,20 @@ class ProfileCog(commands.Cog):
             await interaction.response.send_message("Invalid artist.", ephemeral=True)
             return
 
+        # One statement sets the badge and returns the artist's name; no row
+        # means the artist is not a favourite (so no ensure_user either).
         row = await db.fetch_one(
             """
-            SELECT a.name
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=? AND ufa.artist_id=?
+            UPDATE user_fav_artists SET badge=?
+            WHERE user_id=? AND artist_id=?
+            RETURNING (SELECT name FROM artists WHERE artist_id = user_fav_artists.artist_id) AS name
             """,
-            (user_id, artist_id),
+            (badge.value, user_id, artist_id),
         )
         if not row:
             await interaction.response.send_message("This artist is not in your favourites.", ephemeral=True)
             return
         canonical_name = row["name"]
-        await db.execute(
-            "UPDATE user_fav_artists SET badge=? WHERE user_id=? AND artist_id=?",
-            (badge.value, user_id, artist_id),
-        )
         await interaction.response.send_message(
             f"✅ Badge **{badge.value}** set for **{canonical_name}**.", ephemeral=True
         )
@@ -1038,51 +1055,12 @@ class ProfileCog(commands.Cog):
         await self._safe_defer(interaction, ephemeral=True)
         try:
             if mode.value == "name":
-                rows = await db.fetch_all(
-                    """
-                    SELECT ufa.artist_id
-                    FROM user_fav_artists ufa
-                    JOIN artists a ON a.artist_id = ufa.artist_id
-                    WHERE ufa.user_id=?
-                    ORDER BY a.name COLLATE NOCASE
-                    """,
-                    (user_id,),
-                )
-                async with db.transaction():
-                    for idx, r in enumerate(rows, start=1):
-                        await db.execute(
-                            "UPDATE user_fav_artists SET position=? WHERE user_id=? AND artist_id=?",
-                            (idx, user_id, r["artist_id"]),
-                        )
+                await db.execute(_SQL_SORT_ARTISTS_BY_NAME, (user_id,))
+                self._touch_lists(user_id)
                 await self._respond(interaction, content="✅ Favorite artists sorted alphabetically.")
             elif mode.value == "badge":
-                rows = await db.fetch_all(
-                    """
-                    SELECT ufa.artist_id
-                    FROM user_fav_artists ufa
-                    JOIN artists a ON a.artist_id = ufa.artist_id
-                    WHERE ufa.user_id=?
-                    ORDER BY CASE ufa.badge
-                        WHEN 'Shiny' THEN 7
-                        WHEN 'VIP' THEN 6
-                        WHEN 'Legendary' THEN 5
-                        WHEN 'Diamond' THEN 4
-                        WHEN 'Platinum' THEN 3
-                        WHEN 'Gold' THEN 2
-                        WHEN 'Silver' THEN 1
-                        WHEN 'Bronze' THEN 0
-                        ELSE -1
-                    END DESC,
-                    a.name COLLATE NOCASE
-                    """,
-                    (user_id,),
-                )
-                async with db.transaction():
-                    for idx, r in enumerate(rows, start=1):
-                        await db.execute(
-                            "UPDATE user_fav_artists SET position=? WHERE user_id=? AND artist_id=?",
-                            (idx, user_id, r["artist_id"]),
-                        )
+                await db.execute(_SQL_SORT_ARTISTS_BY_BADGE, (user_id,))
+                self._touch_lists(user_id)
                 await self._respond(interaction, content="✅ Favorite artists sorted by badge.")
             else:
                 if not artist:
@@ -1096,20 +1074,16 @@ class ProfileCog(commands.Cog):
                 except ValueError:
                     await self._respond(interaction, content="Invalid artist.")
                     return
-                row = await db.fetch_one(
-                    """
-                    SELECT position FROM user_fav_artists
-                    WHERE user_id=? AND artist_id=?
-                    """,
-                    (user_id, artist_id),
+                view = MoveView(
+                    self, user_id, artist_id, _SQL_ARTIST_WINDOW, self.move_artist_to,
+                    "Artist not found.",
                 )
-                if not row:
+                content = await view._render()
+                if view.pos is None:
                     await self._respond(
                         interaction, content="This artist is not in your favourites."
                     )
                     return
-                view = MoveArtistView(self, user_id, artist_id)
-                content = await view._render()
                 await self._respond(interaction, content=content, view=view)
         except Exception as e:
             await self._respond(
@@ -1134,26 +1108,8 @@ class ProfileCog(commands.Cog):
         await self._safe_defer(interaction, ephemeral=True)
         try:
             if mode.value == "name":
-                rows = await db.fetch_all(
-                    """
-                    SELECT ue.track_id, ue.epic_number
-                    FROM user_epics ue
-                    JOIN tracks t ON t.track_id = ue.track_id
-                    WHERE ue.user_id=?
-                    ORDER BY t.artist_name COLLATE NOCASE, t.title COLLATE NOCASE, ue.epic_number ASC
-                    """,
-                    (user_id,),
-                )
-                async with db.transaction():
-                    for idx, r in enumerate(rows, start=1):
-                        await db.execute(
-                            """
-                            UPDATE user_epics
-                            SET position=?
-                            WHERE user_id=? AND track_id=? AND epic_number=?
-                            """,
-                            (idx, user_id, r["track_id"], r["epic_number"]),
-                        )
+                await db.execute(_SQL_SORT_EPICS_BY_NAME, (user_id,))
+                self._touch_lists(user_id)
                 await self._respond(interaction, content="✅ Epics sorted alphabetically.")
             else:
                 if not epic:
@@ -1167,20 +1123,20 @@ class ProfileCog(commands.Cog):
                 except Exception:
                     await self._respond(interaction, content="Invalid Epic.")
                     return
-                row = await db.fetch_one(
-                    """
-                    SELECT position FROM user_epics
-                    WHERE user_id=? AND track_id=? AND epic_number=?
-                    """,
-                    (user_id, track_id, epic_number),
+                view = MoveView(
+                    self,
+                    user_id,
+                    track_id,
+                    _SQL_EPIC_WINDOW,
+                    lambda uid, key, pos: self.move_epic_to(uid, key, epic_number, pos),
+                    "Epic not found.",
                 )
-                if not row:
+                content = await view._render()
+                if view.pos is None:
                     await self._respond(
                         interaction, content="This Epic is not in your collection."
                     )
                     return
-                view = MoveEpicView(self, user_id, track_id, epic_number)
-                content = await view._render()
                 await self._respond(interaction, content=content, view=view)
         except Exception as e:
             await self._respond(
@@ -1205,22 +1161,8 @@ class ProfileCog(commands.Cog):
         await self._safe_defer(interaction, ephemeral=True)
         try:
             if mode.value == "name":
-                rows = await db.fetch_all(
-                    """
-                    SELECT uw.track_id
-                    FROM user_wishlist_epics uw
-                    JOIN tracks t ON t.track_id = uw.track_id
-                    WHERE uw.user_id=?
-                    ORDER BY t.artist_name COLLATE NOCASE, t.title COLLATE NOCASE
-                    """,
-                    (user_id,),
-                )
-                async with db.transaction():
-                    for idx, r in enumerate(rows, start=1):
-                        await db.execute(
-                            "UPDATE user_wishlist_epics SET position=? WHERE user_id=? AND track_id=?",
-                            (idx, user_id, r["track_id"]),
-                        )
+                await db.execute(_SQL_SORT_WISHES_BY_NAME, (user_id,))
+                self._touch_lists(user_id)
                 await self._respond(interaction, content="✅ Wishlist sorted alphabetically.")
             else:
                 if not track:
@@ -1228,21 +1170,15 @@ class ProfileCog(commands.Cog):
                         interaction, content="Provide a wish to move using autocomplete."
                     )
                     return
-                track_id = track
-                row = await db.fetch_one(
-                    """
-                    SELECT position FROM user_wishlist_epics
-                    WHERE user_id=? AND track_id=?
-                    """,
-                    (user_id, track_id),
+                view = MoveView(
+                    self, user_id, track, _SQL_WISH_WINDOW, self.move_wish_to, "Wish not found."
                 )
-                if not row:
+                content = await view._render()
+                if view.pos is None:
                     await self._respond(
                         interaction, content="This wish is not in your wishlist."
                     )
                     return
-                view = MoveWishView(self, user_id, track_id)
-                content = await view._render()
                 await self._respond(interaction, content=content, view=view)
         except Exception as e:
             await self._respond(
@@ -1256,84 +1192,94 @@ class ProfileCog(commands.Cog):
         member = user or interaction.user
         user_id = str(member.id)
         await self.ensure_user(user_id)
-        # Fetch username
-        row = await db.fetch_one(
-            "SELECT username FROM users WHERE user_id=?",
-            (user_id,),
-        )
-        username = row["username"] if row else None
-        # Fetch epics in insertion order
-        epics = await db.fetch_all(
-            """
-            SELECT ue.epic_number, t.title, t.artist_name, t.url
-            FROM user_epics ue
-            JOIN tracks t ON t.track_id = ue.track_id
-            WHERE ue.user_id=?
-            ORDER BY ue.position ASC, ue.epic_number ASC
-            """,
-            (user_id,),
-        )
-        # Fetch wishlist in insertion order
-        wishlist = await db.fetch_all(
-            """
-            SELECT t.title, t.artist_name, uw.note, t.url
-            FROM user_wishlist_epics uw
-            JOIN tracks t ON t.track_id = uw.track_id
-            WHERE uw.user_id=?
-            ORDER BY uw.position ASC
-            """,
-            (user_id,),
-        )
-        # Fetch favourite artists in insertion order
-        favs = await db.fetch_all(
-            """
-            SELECT a.name, ufa.badge
-            FROM user_fav_artists ufa
-            JOIN artists a ON a.artist_id = ufa.artist_id
-            WHERE ufa.user_id=?
-            ORDER BY ufa.position ASC
-            """,
-            (user_id,),
+        # Username, then epics, wishlist and favourite artists in list order.
+        # Only the first 15 entries of each list are shown, so each query is
+        # capped and carries the full count from a scalar subquery. Unlike
+        # COUNT(*) OVER (), that count does not stop SQLite from streaming the
+        # rows in (user_id, position) index order and stopping after 16.
+        # Epic and wish display lines are assembled by SQLite directly. The
+        # three list queries are independent and run concurrently on the
+        # read-only connection pool.
+        username = self._usernames.get(user_id, _MISSING)
+        if username is _MISSING:
+            row = await db.read_one("SELECT username FROM users WHERE user_id=?", (user_id,))
+            username = row["username"] if row else None
+            self._usernames.set(user_id, username)
+        epics, wishlist, favs = await asyncio.gather(
+            db.read_all(
+                """
+                SELECT t.artist_name || ' – ' || t.title || ' #' || ue.epic_number AS line,
+                       (SELECT COUNT(*) FROM user_epics WHERE user_id=?1) AS total
+                FROM user_epics ue
+                JOIN tracks t ON t.track_id = ue.track_id
+                WHERE ue.user_id=?1
+                ORDER BY ue.position ASC, ue.epic_number ASC
+                LIMIT 16
+                """,
+                (user_id,),
+            ),
+            db.read_all(
+                """
+                SELECT t.artist_name || ' – ' || t.title
+                         || CASE WHEN uw.note IS NOT NULL AND uw.note != ''
+                                 THEN ' — _' || uw.note || '_' ELSE '' END AS line,
+                       (SELECT COUNT(*) FROM user_wishlist_epics WHERE user_id=?1) AS total
+                FROM user_wishlist_epics uw
+                JOIN tracks t ON t.track_id = uw.track_id
+                WHERE uw.user_id=?1
+                ORDER BY uw.position ASC
+                LIMIT 16
+                """,
+                (user_id,),
+            ),
+            db.read_all(
+                """
+                SELECT a.name, ufa.badge,
+                       (SELECT COUNT(*) FROM user_fav_artists WHERE user_id=?1) AS total
+                FROM user_fav_artists ufa
+                JOIN artists a ON a.artist_id = ufa.artist_id
+                WHERE ufa.user_id=?1
+                ORDER BY ufa.position ASC
+                LIMIT 16
+                """,
+                (user_id,),
+            ),
         )
-        # Build embed
+        epics_total = epics[0]["total"] if epics else 0
+        wishlist_total = wishlist[0]["total"] if wishlist else 0
+        favs_total = favs[0]["total"] if favs else 0
+        # Build embed; fields are added in display order, username first
         embed = discord.Embed(
             title=f"🎵 {member.display_name}'s Soundmap Collection",
             color=discord.Color.purple(),
         )
         if username:
-            embed.insert_field_at(0, name="👤 SM-Username", value=username, inline=False)
+            embed.add_field(name="👤 SM-Username", value=username, inline=False)
         # Epics list
         if epics:
-            epic_lines: list[str] = []
-            for i, e in enumerate(epics[:15]):  # show up to 15
-                # Display format: "Artist – Title #Number" instead of "#Number: Artist – Title"
-                epic_lines.append(
-                    f"{e['artist_name']} – {e['title']} #{e['epic_number']}"
-                )
-            more = "" if len(epics) <= 15 else f"\n… {len(epics) - 15} more"
-            embed.add_field(name=f"💎 Epics ({len(epics)})", value="\n".join(epic_lines) + more, inline=False)
+            # Display format: "Artist – Title #Number" (built in SQL), up to 15
+            more = "" if epics_total <= 15 else f"\n… {epics_total - 15} more"
+            value = "\n".join(e["line"] for e in epics[:15]) + more
+            embed.add_field(name=f"💎 Epics ({epics_total})", value=value, inline=False)
         else:
             embed.add_field(name="💎 Epics", value="No epics", inline=False)
         # Favourite artists with badge
         if favs:
-            fa_lines: list[str] = []
-            for a in favs[:15]:
-                badge = a["badge"]
-                badge_emoji = BADGE_EMOJIS.get(badge, "")
-                badge_str = f" — {badge_emoji} {badge}" if badge else ""
-                fa_lines.append(f"{a['name']}{badge_str}")
-            more = "" if len(favs) <= 15 else f"\n… {len(favs) - 15} more"
-            embed.add_field(name=f"🌟 Favorite Artists ({len(favs)})", value="\n".join(fa_lines) + more, inline=False)
+            more = "" if favs_total <= 15 else f"\n… {favs_total - 15} more"
+            value = "\n".join(
+                f"{a['name']} — {BADGE_EMOJIS.get(a['badge'], '')} {a['badge']}"
+                if a["badge"]
+                else a["name"]
+                for a in favs[:15]
+            ) + more
+            embed.add_field(name=f"🌟 Favorite Artists ({favs_total})", value=value, inline=False)
         else:
             embed.add_field(name="🌟 Favorite Artists", value="No favorite artists", inline=False)
         # Wishlist
         if wishlist:
-            wl_lines: list[str] = []
-            for w in wishlist[:15]:
-                note_part = f" — _{w['note']}_" if w['note'] else ""
-                wl_lines.append(f"{w['artist_name']} – {w['title']}{note_part}")
-            more = "" if len(wishlist) <= 15 else f"\n… {len(wishlist) - 15} more"
-            embed.add_field(name=f"🎯 Wishlist ({len(wishlist)})", value="\n".join(wl_lines) + more, inline=False)
+            more = "" if wishlist_total <= 15 else f"\n… {wishlist_total - 15} more"
+            value = "\n".join(w["line"] for w in wishlist[:15]) + more
+            embed.add_field(name=f"🎯 Wishlist ({wishlist_total})", value=value, inline=False)
         else:
             embed.add_field(name="🎯 Wishlist", value="No wishes", inline=False)
 
@@ -1342,20 +1288,7 @@ class ProfileCog(commands.Cog):
     # Command: wishcurrent (current song as wishlist)
     @app_commands.command(name="wishcurrent", description="Add the currently playing song to your wishlist")
     async def wishcurrent(self, interaction: discord.Interaction) -> None:
-        # Check if the user's Spotify activity is visible. Slash command interactions
-        # may provide a bare User without cached presence data, so attempt to
-        # retrieve the Member object from the guild cache first.
-        member = getattr(interaction, "user", None)
-        if getattr(interaction, "guild", None):
-            member = interaction.guild.get_member(interaction.user.id) or interaction.user
-        activity = next(
-            (
-                a
-                for a in getattr(member, "activities", [])
-                if isinstance(a, discord.Spotify)
-            ),
-            None,
-        )
+        activity = _current_spotify(interaction)
         if not activity:
             await interaction.response.send_message(
                 "I don't see a currently playing Spotify song or you've hidden your activity.",
@@ -1363,40 +1296,33 @@ class ProfileCog(commands.Cog):
             )
             return
         user_id = str(interaction.user.id)
+        # discord.Spotify exposes these as computed properties; read them once
+        track_id, title, artist = activity.track_id, activity.title, activity.artist
         await self.ensure_user(user_id)
-        track_id = activity.track_id
-        # Upsert track
-        await spotify.upsert_track(track_id, activity.title, activity.artist, activity.track_url)
-        # Add to wishlist
-        row = await db.fetch_one(
-            "SELECT 1 FROM user_wishlist_epics WHERE user_id=? AND track_id=?",
-            (user_id, track_id),
-        )
-        if not row:
-            next_pos = await self.get_next_wish_position(user_id)
-            await db.execute(
-                "INSERT INTO user_wishlist_epics(user_id, track_id, note, position) VALUES(?,?,?,?)",
-                (user_id, track_id, None, next_pos),
+        async with db.transaction():
+            # Upsert track
+            await spotify.upsert_track(track_id, title, artist, activity.track_url)
+            # Add to wishlist at position 0 and only shift the list when it is new
+            inserted = await db.fetch_one(
+                """
+                INSERT INTO user_wishlist_epics(user_id, track_id, note, position) VALUES(?,?,NULL,0)
+                ON CONFLICT(user_id, track_id) DO NOTHING
+                RETURNING position
+                """,
+                (user_id, track_id),
             )
+            if inserted is not None:
+                await self.get_next_wish_position(user_id)
+        self._touch_lists(user_id)
         await interaction.response.send_message(
-            f"✅ Wish added: **{activity.artist} – {activity.title}**.",
+            f"✅ Wish added: **{artist} – {title}**.",
             ephemeral=True,
         )
 
     # ---------- UPDATED: favartistcurrent normalized via Spotify ----------
     @app_commands.command(name="favartistcurrent", description="Add the currently playing artist as a favorite artist")
     async def favartistcurrent(self, interaction: discord.Interaction) -> None:
-        member = getattr(interaction, "user", None)
-        if getattr(interaction, "guild", None):
-            member = interaction.guild.get_member(interaction.user.id) or interaction.user
-        activity = next(
-            (
-                a
-                for a in getattr(member, "activities", [])
-                if isinstance(a, discord.Spotify)
-            ),
-            None,
-        )
+        activity = _current_spotify(interaction)
         if not activity:
             await interaction.response.send_message(
                 "I don't see a currently playing Spotify song or you've hidden your activity.",
@@ -1404,26 +1330,26 @@ class ProfileCog(commands.Cog):
             )
             return
         user_id = str(interaction.user.id)
-        await self.ensure_user(user_id)
-
-        # Normalization via Spotify
-        sp = await spotify.get_canonical_artist(activity.artist)
-        canonical_name = sp["name"] if sp else activity.artist
 
-        # Insert artist if needed
-        await db.execute(
-            "INSERT INTO artists(name) VALUES(?) ON CONFLICT(name) DO NOTHING",
-            (canonical_name,),
+        # Normalisation via Spotify, keeping the activity's name if unknown
+        canonical_name, artist_id_int = await self._resolve_artist(
+            activity.artist, trust_raw=True
         )
-        row = await db.fetch_one("SELECT artist_id FROM artists WHERE name=?", (canonical_name,))
-        artist_id_int = row["artist_id"]
 
-        # Add favourite
-        next_pos = await self.get_next_artist_position(user_id)
-        await db.execute(
-            "INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES(?,?,?) ON CONFLICT(user_id, artist_id) DO NOTHING",
-            (user_id, artist_id_int, next_pos),
-        )
+        await self.ensure_user(user_id)
+        async with db.transaction():
+            # Add favourite at position 0 and only shift the list when it is new
+            inserted = await db.fetch_one(
+                """
+                INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES(?,?,0)
+                ON CONFLICT(user_id, artist_id) DO NOTHING
+                RETURNING position
+                """,
+                (user_id, artist_id_int),
+            )
+            if inserted is not None:
+                await self.get_next_artist_position(user_id)
+        self._touch_lists(user_id)
         await interaction.response.send_message(
             f"✅ Favorite artist added: **{canonical_name}**.",
             ephemeral=True,
@@ -4,15 +4,22 @@ This module centralises database access for the Soundmap Discord bot. It
 provides simple helper functions for common tasks such as executing queries,
 fetching single or multiple rows and managing transactions. All functions
 automatically initialise the database connection on first use and apply
-migrations using the SQL file in the migrations directory.
+migrations using the SQL files in the migrations directory.
+
+Writes and ``RETURNING`` statements go through one read-write connection.
+Pure reads that do not need to see the caller's own open transaction can use
+:func:`read_one` and :func:`read_all`, which run on a small pool of read-only
+connections so they do not queue behind writes.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import aiosqlite
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Callable
 
 from .config import DATABASE_PATH
 
@@ -20,28 +27,171 @@ from .config import DATABASE_PATH
 DB_PATH = Path(DATABASE_PATH).expanduser()
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Numbered migration scripts (NNN_description.sql) applied in order
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Number of prepared statements sqlite3 keeps per connection. The cogs issue
+# roughly 100 distinct SQL strings, close to sqlite3's default of 128, so the
+# cache is raised to keep every one of them prepared as more are added.
+CACHED_STATEMENTS = 1024
+
+# Applied every time the connection is opened. WAL lets reads proceed while a
+# write is pending and, with synchronous=NORMAL, only fsyncs at checkpoints;
+# busy_timeout makes SQLite wait up to 5 s for a lock held by another process
+# (e.g. a backup or the sqlite3 shell) instead of failing with "database is
+# locked". The remaining settings keep temp tables, hot pages (~64 MB) and a
+# 256 MB memory map in RAM.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA foreign_keys = ON",
+)
+
+# Number of read-only connections used by read_one/read_all, and the pragmas
+# they are opened with. Journal mode and durability are properties of the
+# writer; readers only need the memory settings.
+READ_POOL_SIZE = 2
+READER_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16000",
+)
+
 _db: aiosqlite.Connection | None = None
 _tx_depth: int = 0  # Number of currently active explicit transaction blocks
+_tx_owner: asyncio.Task | None = None  # Task that opened the active transaction
+_on_commit: list[Callable[[], None]] = []  # callbacks for the active transaction
+
+# All commands share one connection, so only one task may use it at a time for
+# a transaction. The lock is held from BEGIN until COMMIT/ROLLBACK and by every
+# standalone statement, which therefore never runs inside another task's
+# transaction.
+_lock: asyncio.Lock | None = None
+_lock_loop: asyncio.AbstractEventLoop | None = None
+
+# Read-only connections opened so far and a per-event-loop queue of the idle
+# ones. In WAL mode each reader sees the last committed state without waiting
+# for the writer.
+_readers: list[aiosqlite.Connection] = []
+_reader_slots: int = 0  # connections opened or being opened
+_idle_readers: asyncio.Queue | None = None
+_idle_loop: asyncio.AbstractEventLoop | None = None
 
 
 async def get_db() -> aiosqlite.Connection:
     """Return a global aiosqlite connection. Initialise on first use.
 
-    The connection uses Row objects, allowing dict-like access to columns.
+    The connection uses Row objects, allowing dict-like access to columns, and
+    a large statement cache so repeated queries skip SQLite's parser. The
+    :data:`CONNECTION_PRAGMAS` are applied right after connecting.
     """
     global _db
     if _db is None:
-        _db = await aiosqlite.connect(str(DB_PATH))
-        _db.row_factory = aiosqlite.Row
+        conn = await aiosqlite.connect(str(DB_PATH), cached_statements=CACHED_STATEMENTS)
+        conn.row_factory = aiosqlite.Row
+        for pragma in CONNECTION_PRAGMAS:
+            async with conn.execute(pragma):
+                pass
+        _db = conn
     return _db
 
 
+async def _open_reader() -> aiosqlite.Connection:
+    """Open a read-only connection to the database file."""
+    # The writer creates the file and switches it to WAL before readers attach
+    await get_db()
+    conn = await aiosqlite.connect(
+        f"{DB_PATH.resolve().as_uri()}?mode=ro",
+        uri=True,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    conn.row_factory = aiosqlite.Row
+    for pragma in READER_PRAGMAS:
+        async with conn.execute(pragma):
+            pass
+    return conn
+
+
+@asynccontextmanager
+async def _reader():
+    """Borrow a read-only connection, opening one if the pool is not full."""
+    global _idle_readers, _idle_loop, _reader_slots
+    loop = asyncio.get_running_loop()
+    if _idle_readers is None or _idle_loop is not loop:
+        _idle_readers = asyncio.Queue()
+        _idle_loop = loop
+        for conn in _readers:
+            _idle_readers.put_nowait(conn)
+    idle = _idle_readers
+    if idle.empty() and _reader_slots < READ_POOL_SIZE:
+        _reader_slots += 1
+        try:
+            conn = await _open_reader()
+        except BaseException:
+            _reader_slots -= 1
+            raise
+        _readers.append(conn)
+    else:
+        conn = await idle.get()
+    try:
+        yield conn
+    finally:
+        idle.put_nowait(conn)
+
+
+def _get_lock() -> asyncio.Lock:
+    """Return the connection lock, creating it for the running event loop."""
+    global _lock, _lock_loop
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock = asyncio.Lock()
+        _lock_loop = loop
+    return _lock
+
+
+def _in_own_transaction() -> bool:
+    """Return True if the current task has an explicit transaction open."""
+    return _tx_depth > 0 and _tx_owner is asyncio.current_task()
+
+
+@asynccontextmanager
+async def _statement():
+    """Yield the connection for a single statement.
+
+    Inside the current task's own :func:`transaction` block the statement
+    simply joins it. Otherwise the connection lock is taken for the duration
+    of the statement and its implicit transaction is committed afterwards (or
+    rolled back if the statement failed or the task was cancelled).
+    """
+    if _in_own_transaction():
+        yield await get_db()
+        return
+    async with _get_lock():
+        db = await get_db()
+        try:
+            yield db
+        except BaseException:
+            if db.in_transaction:
+                await db.rollback()
+            raise
+        # SQLite starts an implicit transaction even for SELECT statements;
+        # end it so the next writer can BEGIN.
+        await db.commit()
+
+
 async def init_db() -> None:
-    """Initialise the database schema by executing the migration file.
+    """Initialise the database schema by executing the migration files.
 
-    This function reads the SQL commands from migrations/001_init.sql relative
-    to the project root and executes them. It is idempotent and safe to run
-    multiple times; tables will only be created if they do not already exist.
+    Every ``migrations/NNN_*.sql`` script whose number is greater than the
+    database's ``PRAGMA user_version`` is executed in order, after which
+    ``user_version`` is bumped to that number, in the same transaction as the
+    script. Running this function multiple times is safe; already applied
+    migrations are skipped.
     """
     if DB_PATH.exists():
         size = DB_PATH.stat().st_size
@@ -49,15 +199,26 @@ async def init_db() -> None:
     else:
         logging.info("Database path: %s (missing)", DB_PATH)
     db = await get_db()
-    # Resolve the path to the migration file relative to this file
-    migration_path = Path(__file__).resolve().parent.parent / "migrations" / "001_init.sql"
-    async with db.execute("PRAGMA foreign_keys = ON;"):
-        pass  # ensure foreign keys enforced
-    sql = migration_path.read_text(encoding="utf-8")
-    # executescript automatically wraps statements in a single transaction
-    await db.executescript(sql)
-    await db.commit()
-    # Schema is defined fully in the migration; no additional columns needed here.
+    async with db.execute("PRAGMA user_version") as cursor:
+        row = await cursor.fetchone()
+    version = row[0] if row else 0
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        number = int(path.name.split("_", 1)[0])
+        if number <= version:
+            continue
+        logging.info("Applying migration %s", path.name)
+        # The script and its version bump commit together, so a failing
+        # migration leaves neither half-applied schema nor a new version.
+        # PRAGMA does not accept bound parameters; number is parsed as int above
+        script = path.read_text(encoding="utf-8")
+        try:
+            await db.executescript(
+                f"BEGIN;\n{script}\n;PRAGMA user_version = {number};\nCOMMIT;"
+            )
+        except BaseException:
+            if db.in_transaction:
+                await db.rollback()
+            raise
 
 
 async def fetch_one(query: str, params: tuple | list = ()) -> aiosqlite.Row | None:
@@ -65,14 +226,9 @@ async def fetch_one(query: str, params: tuple | list = ()) -> aiosqlite.Row | No
 
     Returns None if no row matches the query.
     """
-    db = await get_db()
-    async with db.execute(query, params) as cursor:
-        row = await cursor.fetchone()
-    # SQLite starts an implicit transaction even for SELECT statements. End it
-    # as long as we are NOT inside our own explicit block.
-    if db.in_transaction and _tx_depth == 0:
-        await db.commit()
-    return row
+    async with _statement() as db:
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchone()
 
 
 async def fetch_all(query: str, params: tuple | list = ()) -> list[aiosqlite.Row]:
@@ -80,14 +236,35 @@ async def fetch_all(query: str, params: tuple | list = ()) -> list[aiosqlite.Row
 
     Returns an empty list if no rows match.
     """
-    db = await get_db()
-    async with db.execute(query, params) as cursor:
-        rows = await cursor.fetchall()
-    # As with fetch_one: end the implicit transaction after a SELECT
-    # unless we are in an explicit block.
-    if db.in_transaction and _tx_depth == 0:
-        await db.commit()
-    return rows
+    async with _statement() as db:
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchall()
+
+
+async def read_one(query: str, params: tuple | list = ()) -> aiosqlite.Row | None:
+    """Like :func:`fetch_one`, for read-only queries, on a reader connection.
+
+    Inside the current task's own :func:`transaction` the query runs on the
+    writer instead, so it sees the transaction's uncommitted changes.
+    """
+    if _in_own_transaction():
+        return await fetch_one(query, params)
+    async with _reader() as db:
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchone()
+
+
+async def read_all(query: str, params: tuple | list = ()) -> list[aiosqlite.Row]:
+    """Like :func:`fetch_all`, for read-only queries, on a reader connection.
+
+    Inside the current task's own :func:`transaction` the query runs on the
+    writer instead, so it sees the transaction's uncommitted changes.
+    """
+    if _in_own_transaction():
+        return await fetch_all(query, params)
+    async with _reader() as db:
+        async with db.execute(query, params) as cursor:
+            return await cursor.fetchall()
 
 
 async def execute(query: str, params: tuple | list = ()) -> None:
@@ -98,12 +275,21 @@ async def execute(query: str, params: tuple | list = ()) -> None:
     callers to group multiple ``execute`` calls atomically without each one
     committing independently.
     """
-    db = await get_db()
-    await db.execute(query, params)
-    # Only commit when we are NOT in an explicit block.
-    # (db.in_transaction may be True because of implicit SELECT transactions.)
-    if _tx_depth == 0:
-        await db.commit()
+    async with _statement() as db:
+        await db.execute(query, params)
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Call ``callback`` once the current task's writes are committed.
+
+    Inside the task's own :func:`transaction` the call is deferred until that
+    transaction commits and dropped if it rolls back. Otherwise the preceding
+    statement has already committed and ``callback`` runs immediately.
+    """
+    if _in_own_transaction():
+        _on_commit.append(callback)
+    else:
+        callback()
 
 
 @asynccontextmanager
@@ -117,25 +303,47 @@ async def transaction():
             await execute(...)
 
     On successful exit, the transaction is committed. On exception, it is
-    rolled back and the exception is re-raised.
+    rolled back and the exception is re-raised. Nested blocks in the same task
+    join the outer transaction; other tasks wait until it has finished.
     """
-    db = await get_db()
-    global _tx_depth
-    outermost = (_tx_depth == 0)
-    if outermost:
+    global _tx_depth, _tx_owner
+    if _in_own_transaction():
+        _tx_depth += 1
+        try:
+            yield
+        finally:
+            _tx_depth -= 1
+        return
+    async with _get_lock():
+        db = await get_db()
         await db.execute("BEGIN")
-    _tx_depth += 1
-    try:
-        yield
-    except Exception:
-        # Only the outermost transaction rolls back.
-        if outermost:
+        _tx_owner = asyncio.current_task()
+        _tx_depth = 1
+        try:
+            yield
+        except BaseException:
             await db.rollback()
-        # Cleanly reset depth before re-raising the exception
-        _tx_depth = max(0, _tx_depth - 1)
-        raise
-    else:
-        _tx_depth -= 1
-        # Only the outermost transaction commits.
-        if outermost:
+            raise
+        else:
             await db.commit()
+            callbacks = list(_on_commit)
+        finally:
+            _tx_depth = 0
+            _tx_owner = None
+            _on_commit.clear()
+        for callback in callbacks:
+            callback()
+
+
+async def close() -> None:
+    """Close the reader pool and the read-write connection, if open."""
+    global _db, _readers, _reader_slots, _idle_readers, _idle_loop
+    readers, _readers = _readers, []
+    _reader_slots = 0
+    _idle_readers = None
+    _idle_loop = None
+    for conn in readers:
+        await conn.close()
+    if _db is not None:
+        conn, _db = _db, None
+        await conn.close()
@@ -6,6 +6,10 @@ expire and exposes helpers for searching tracks and upserting track metadata
 into the local database.
 
 It also provides artist search helpers used for validation and autocomplete.
+Artist searches and canonical artist lookups are memoised in-process for an
+hour since artist names practically never change, and tracks returned by a
+search are kept for two minutes so that submitting an autocomplete choice
+needs no second request.
 """
 
 from __future__ import annotations
@@ -19,9 +23,19 @@ from typing import Any
 
 from .config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET
 from . import db as db_module
+from .util import TTLCache
 
 _session: aiohttp.ClientSession | None = None
 _token_data: dict[str, Any] = {"access_token": None, "expires_at": 0.0}
+# Canonical artist per lowercased query; only successful lookups are stored
+_canonical_artist_cache: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=4096, ttl=3600)
+# Artist search results per (lowercased query, limit); empty results included
+_artist_search_cache: TTLCache[tuple[str, int], list[dict[str, Any]]] = TTLCache(maxsize=2048, ttl=3600)
+# Tracks seen in recent searches, keyed by track ID, consulted by get_track
+_recent_tracks: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=2048, ttl=120)
+# Bumped once an upsert_track write has committed; lets callers that cache
+# local track searches tell whether the tracks table may have changed since.
+tracks_version = 0
 
 
 async def _get_session() -> aiohttp.ClientSession:
@@ -117,13 +131,15 @@ async def search_tracks(query: str, limit: int = 5) -> list[dict[str, Any]]:
         url = item["external_urls"]["spotify"]
         release_date = item.get("album", {}).get("release_date") or ""
         year = release_date.split("-")[0] if release_date else ""
-        tracks.append({
+        track = {
             "track_id": track_id,
             "title": title,
             "artist_name": artist_name,
             "url": url,
             "year": year,
-        })
+        }
+        _recent_tracks.set(track_id, track)
+        tracks.append(track)
     return tracks
 
 
@@ -132,8 +148,12 @@ async def get_track(track_id: str) -> dict[str, Any] | None:
 
     The returned dictionary matches ``search_tracks`` entries with keys:
     ``track_id``, ``title``, ``artist_name``, ``url`` and ``year``. ``None`` is
-    returned if the track is not found.
+    returned if the track is not found. Tracks from a recent
+    :func:`search_tracks` call are served from memory.
     """
+    cached = _recent_tracks.get(track_id)
+    if cached is not None:
+        return dict(cached)
     token = await get_token()
     session = await _get_session()
     headers = {"Authorization": f"Bearer {token}"}
@@ -166,9 +186,16 @@ async def search_artists(query: str, limit: int = 10) -> list[dict[str, Any]]:
     """Search artists on Spotify.
 
     Returns a list of dicts with at least: {"id": str, "name": str, "popularity": int}
+    Results are cached per case-insensitive query and limit for an hour, and
+    each returned artist also primes :func:`get_canonical_artist` for its
+    exact name.
     """
     if not query.strip():
         return []
+    key = (query.strip().lower(), limit)
+    cached = _artist_search_cache.get(key)
+    if cached is not None:
+        return list(cached)
     token = await get_token()
     session = await _get_session()
     params = {"q": query, "type": "artist", "limit": limit}
@@ -185,13 +212,31 @@ async def search_artists(query: str, limit: int = 10) -> list[dict[str, Any]]:
             "name": a["name"],
             "popularity": int(a.get("popularity", 0)),
         })
-    return results
+    _artist_search_cache.set(key, results)
+    # Autocomplete offers these names verbatim, so the command that receives
+    # one can canonicalise it without searching again. The first (most
+    # relevant) artist wins when several share a name.
+    for artist in results:
+        name_key = artist["name"].lower()
+        if _canonical_artist_cache.get(name_key) is None:
+            _canonical_artist_cache.set(name_key, artist)
+    return list(results)
 
 
 async def get_canonical_artist(query: str) -> dict[str, Any] | None:
-    """Return the best matching artist (first result) or None if not found."""
+    """Return the best matching artist (first result) or None if not found.
+
+    Results are cached per case-insensitive query for an hour.
+    """
+    key = query.strip().lower()
+    cached = _canonical_artist_cache.get(key)
+    if cached is not None:
+        return cached
     results = await search_artists(query, limit=1)
-    return results[0] if results else None
+    if not results:
+        return None
+    _canonical_artist_cache.set(key, results[0])
+    return results[0]
 
 
 # -----------------------------------------------------------------------------
@@ -216,3 +261,9 @@ async def upsert_track(track_id: str, title: str, artist_name: str, url: str) ->
         """,
         (track_id, title, artist_name, url),
     )
+    db_module.after_commit(_bump_tracks_version)
+
+
+def _bump_tracks_version() -> None:
+    global tracks_version
+    tracks_version += 1
@@ -1,12 +1,17 @@
 """Utility functions for the Soundmap Discord bot.
 
 This module provides helper functions such as chunking iterables into
-convenient sized batches for paginating long lists in Discord embeds.
+convenient sized batches for paginating long lists in Discord embeds, and a
+small in-memory TTL cache used to avoid repeated Spotify and database lookups.
 """
 
-from typing import Iterable, Iterator, TypeVar
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Iterable, Iterator, TypeVar
 
 T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
 
 
 def chunked(sequence: Iterable[T], size: int) -> Iterator[list[T]]:
@@ -33,3 +38,47 @@ def chunked(sequence: Iterable[T], size: int) -> Iterator[list[T]]:
             chunk = []
     if chunk:
         yield chunk
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded mapping whose entries expire ``ttl`` seconds after being set.
+
+    Once ``maxsize`` entries are stored, the least recently used one is
+    evicted. Expired entries are dropped lazily when they are looked up.
+
+    Example:
+
+        >>> cache = TTLCache(maxsize=2, ttl=60)
+        >>> cache.set("a", 1)
+        >>> cache.get("a")
+        1
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the cached value for ``key`` or ``default`` if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
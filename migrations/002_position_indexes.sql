@@ -0,0 +1,7 @@
+-- Index user_epics by owner and position. move_epic_to and delepic shift
+-- ranges of positions for one user; the MAX(position) clamp and the profile
+-- ORDER BY position, epic_number also read through this index, the trailing
+-- epic_number letting that tie-break come straight from the index instead of
+-- a temp B-tree sort.
+-- Exact (user_id, track_id) lookups are already served by the primary key.
+CREATE INDEX IF NOT EXISTS idx_user_epics_user_pos ON user_epics(user_id, position, epic_number);
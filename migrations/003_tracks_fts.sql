@@ -0,0 +1,36 @@
+-- Full-text index over track titles and artist names for autocomplete.
+-- A regular FTS5 table that stores track_id itself: an external-content table
+-- would be keyed by the implicit rowid of `tracks`, which VACUUM may renumber
+-- (track_id is a TEXT primary key), silently pointing matches at the wrong
+-- tracks. The triggers below keep it in sync with `tracks`.
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+  track_id UNINDEXED,
+  title,
+  artist_name,
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS tracks_fts_ai AFTER INSERT ON tracks BEGIN
+  INSERT INTO tracks_fts(track_id, title, artist_name)
+  VALUES (new.track_id, new.title, new.artist_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_fts_ad AFTER DELETE ON tracks BEGIN
+  DELETE FROM tracks_fts WHERE track_id = old.track_id;
+END;
+
+-- upsert_track rewrites every row it sees; only touch the index when the
+-- searchable text actually changed (the track_id lookup is a table scan).
+CREATE TRIGGER IF NOT EXISTS tracks_fts_au AFTER UPDATE OF track_id, title, artist_name ON tracks
+WHEN old.track_id IS NOT new.track_id
+  OR old.title IS NOT new.title
+  OR old.artist_name IS NOT new.artist_name
+BEGIN
+  DELETE FROM tracks_fts WHERE track_id = old.track_id;
+  INSERT INTO tracks_fts(track_id, title, artist_name)
+  VALUES (new.track_id, new.title, new.artist_name);
+END;
+
+-- Index tracks that existed before this migration.
+INSERT INTO tracks_fts(track_id, title, artist_name)
+SELECT track_id, title, artist_name FROM tracks;
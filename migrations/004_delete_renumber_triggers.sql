@@ -0,0 +1,17 @@
+-- Close the gap left by a removed list entry. Positions are dense (1..n) per
+-- user, so every later entry moves up by one. The delete commands therefore
+-- only need a single DELETE statement.
+CREATE TRIGGER IF NOT EXISTS trg_user_epics_ad AFTER DELETE ON user_epics BEGIN
+  UPDATE user_epics SET position = position - 1
+  WHERE user_id = old.user_id AND position > old.position;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_wishlist_epics_ad AFTER DELETE ON user_wishlist_epics BEGIN
+  UPDATE user_wishlist_epics SET position = position - 1
+  WHERE user_id = old.user_id AND position > old.position;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_fav_artists_ad AFTER DELETE ON user_fav_artists BEGIN
+  UPDATE user_fav_artists SET position = position - 1
+  WHERE user_id = old.user_id AND position > old.position;
+END;
@@ -0,0 +1,5 @@
+-- Index the wishlist and favourite artists by owner and position, matching
+-- idx_user_epics_user_pos. The delete triggers, the insert-at-top shift, the
+-- move statement and the profile ORDER BY all scan one user's positions.
+CREATE INDEX IF NOT EXISTS idx_user_wishlist_epics_user_pos ON user_wishlist_epics(user_id, position);
+CREATE INDEX IF NOT EXISTS idx_user_fav_artists_user_pos ON user_fav_artists(user_id, position);
@@ -0,0 +1,570 @@
+from pathlib import Path
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DISCORD_TOKEN", "test-token")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "cid")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "csecret")
+
+from core import db
+
+
+@pytest.fixture
+def temp_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "bot.db")
+    monkeypatch.setattr(db, "_db", None)
+    monkeypatch.setattr(db, "_readers", [])
+    monkeypatch.setattr(db, "_reader_slots", 0)
+    monkeypatch.setattr(db, "_idle_readers", None)
+    yield
+
+
+def run(coro_fn):
+    """Run ``coro_fn`` on a fresh event loop and close the connections afterwards."""
+
+    async def wrapper():
+        try:
+            return await coro_fn()
+        finally:
+            await db.close()
+
+    return asyncio.run(wrapper())
+
+
+def test_init_db_applies_all_migrations_once(temp_db):
+    async def scenario():
+        await db.init_db()
+        await db.init_db()
+        version = await db.fetch_one("PRAGMA user_version")
+        indexes = await db.fetch_all(
+            "SELECT name FROM sqlite_master WHERE type='index'"
+        )
+        return version[0], {r["name"] for r in indexes}
+
+    version, indexes = run(scenario)
+    latest = max(int(p.name.split("_", 1)[0]) for p in db.MIGRATIONS_DIR.glob("*.sql"))
+    assert version == latest
+    assert {
+        "idx_user_epics_user_pos",
+        "idx_user_wishlist_epics_user_pos",
+        "idx_user_fav_artists_user_pos",
+    } <= indexes
+
+
+def test_tracks_fts_follows_track_upserts(temp_db):
+    from core import spotify
+
+    async def scenario():
+        await db.init_db()
+        await spotify.upsert_track("t1", "Hotline Bling", "Drake", "u1")
+        await spotify.upsert_track("t1", "Passionfruit", "Drake", "u1")
+        query = "SELECT track_id FROM tracks_fts WHERE tracks_fts MATCH ?"
+        old = await db.fetch_all(query, ('"hotl"*',))
+        new = await db.fetch_all(query, ('"passion"*',))
+        return [r["track_id"] for r in old], [r["track_id"] for r in new]
+
+    old, new = run(scenario)
+    assert old == []
+    assert new == ["t1"]
+
+
+def test_concurrent_transactions_do_not_interleave(temp_db):
+    async def failing_write():
+        async with db.transaction():
+            await db.execute("INSERT INTO users(user_id) VALUES('a')")
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+    async def good_write():
+        async with db.transaction():
+            await db.execute("INSERT INTO users(user_id) VALUES('b')")
+            await asyncio.sleep(0)
+
+    async def scenario():
+        await db.init_db()
+        results = await asyncio.gather(failing_write(), good_write(), return_exceptions=True)
+        rows = await db.fetch_all("SELECT user_id FROM users ORDER BY user_id")
+        return results, [r["user_id"] for r in rows]
+
+    results, users = run(scenario)
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] is None
+    assert users == ["b"]
+
+
+def test_concurrent_commands_share_the_connection(temp_db, monkeypatch):
+    import types
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        def __init__(self):
+            self.message = None
+
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    def interaction(user_id):
+        return types.SimpleNamespace(
+            user=types.SimpleNamespace(id=user_id), response=DummyResponse()
+        )
+
+    async def dummy_get_track(track):
+        await asyncio.sleep(0)
+        return {"track_id": track, "title": "Song", "artist_name": "Artist", "url": "u"}
+
+    monkeypatch.setattr(spotify, "get_track", dummy_get_track)
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    first, second = interaction(1), interaction(2)
+
+    async def scenario():
+        await db.init_db()
+        await asyncio.gather(
+            ProfileCog.addepic.callback(cog, first, "t1", 1),
+            ProfileCog.addwish.callback(cog, second, "t2"),
+        )
+        epics = await db.fetch_all("SELECT user_id, track_id FROM user_epics")
+        wishes = await db.fetch_all("SELECT user_id, track_id FROM user_wishlist_epics")
+        return [tuple(r) for r in epics], [tuple(r) for r in wishes]
+
+    epics, wishes = run(scenario)
+    assert epics == [("1", "t1")]
+    assert wishes == [("2", "t2")]
+    assert first.response.message.startswith("✅")
+    assert second.response.message == "✅ Added to wishlist."
+
+
+def test_tracks_fts_survives_vacuum(temp_db):
+    from core import spotify
+
+    async def scenario():
+        await db.init_db()
+        await spotify.upsert_track("t1", "Hotline Bling", "Drake", "u1")
+        await spotify.upsert_track("t2", "Passionfruit", "Drake", "u2")
+        await db.execute("DELETE FROM tracks WHERE track_id='t1'")
+        await db.execute("VACUUM")
+        rows = await db.fetch_all(
+            "SELECT track_id FROM tracks_fts WHERE tracks_fts MATCH ?", ('"drake"*',)
+        )
+        return [r["track_id"] for r in rows]
+
+    assert run(scenario) == ["t2"]
+
+
+def test_connection_pragmas_are_applied(temp_db):
+    async def scenario():
+        await db.init_db()
+        names = ["journal_mode", "synchronous", "busy_timeout", "temp_store", "foreign_keys"]
+        return [(await db.fetch_one(f"PRAGMA {name}"))[0] for name in names]
+
+    assert run(scenario) == ["wal", 1, 5000, 2, 1]
+
+
+def test_delepic_closes_the_gap(temp_db):
+    import types
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1), response=DummyResponse()
+    )
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        for pos, track in enumerate(["a", "b", "c", "d"], start=1):
+            await spotify.upsert_track(track, track, "Artist", "u")
+            await db.execute(
+                "INSERT INTO user_epics(user_id, track_id, epic_number, position) VALUES('1',?,1,?)",
+                (track, pos),
+            )
+        await ProfileCog.delepic.callback(cog, interaction, "b")
+        rows = await db.fetch_all(
+            "SELECT track_id, position FROM user_epics WHERE user_id='1' ORDER BY position"
+        )
+        return [tuple(r) for r in rows]
+
+    assert run(scenario) == [("a", 1), ("c", 2), ("d", 3)]
+    assert interaction.response.message == "✅ Epic removed."
+
+
+def test_move_statements_shift_and_clamp(temp_db):
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+
+    async def order():
+        rows = await db.fetch_all(
+            "SELECT track_id FROM user_wishlist_epics WHERE user_id='1' ORDER BY position"
+        )
+        return "".join(r["track_id"] for r in rows)
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        for pos, track in enumerate("abcd", start=1):
+            await spotify.upsert_track(track, track, "Artist", "u")
+            await db.execute(
+                "INSERT INTO user_wishlist_epics(user_id, track_id, position) VALUES('1',?,?)",
+                (track, pos),
+            )
+        seen = []
+        assert await cog.move_wish_to("1", "d", 2) == 2
+        seen.append(await order())
+        assert await cog.move_wish_to("1", "a", 99) == 4  # clamped to the end
+        seen.append(await order())
+        assert await cog.move_wish_to("1", "c", 3) == 3  # already there
+        seen.append(await order())
+        try:
+            await cog.move_wish_to("1", "zz", 1)
+        except ValueError:
+            seen.append("missing")
+        return seen
+
+    assert run(scenario) == ["adbc", "dbca", "dbca", "missing"]
+
+
+def test_move_wish_view_tracks_its_position(temp_db):
+    import types
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog, MoveView, _SQL_WISH_WINDOW
+    from core import spotify
+
+    class DummyResponse:
+        async def edit_message(self, content=None, **kwargs):
+            self.content = content
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(response=DummyResponse())
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        for pos, track in enumerate("abc", start=1):
+            await spotify.upsert_track(track, track.upper(), "Artist", "u")
+            await db.execute(
+                "INSERT INTO user_wishlist_epics(user_id, track_id, position) VALUES('1',?,?)",
+                (track, pos),
+            )
+        view = MoveView(cog, "1", "c", _SQL_WISH_WINDOW, cog.move_wish_to, "Wish not found.")
+        first = await view._render()
+        await view._move(interaction, -1)
+        return first, view.pos, interaction.response.content
+
+    first, pos, moved = run(scenario)
+    assert first == "2. Artist – B\n3. **Artist – C**\n4. —"
+    assert pos == 2
+    assert moved == "1. Artist – A\n2. **Artist – C**\n3. Artist – B"
+
+
+def test_sortartists_by_badge_renumbers_in_one_statement(temp_db):
+    import types
+    import discord
+    from discord import app_commands
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+
+    class DummyResponse:
+        def is_done(self):
+            return False
+
+        async def defer(self, **kwargs):
+            pass
+
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1), response=DummyResponse()
+    )
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1'), ('2')")
+        artists = [("abba", None), ("Cher", "Gold"), ("Blur", "Gold"), ("Dido", "Shiny")]
+        for pos, (name, badge) in enumerate(artists, start=1):
+            await db.execute("INSERT INTO artists(name) VALUES(?)", (name,))
+            await db.execute(
+                "INSERT INTO user_fav_artists(user_id, artist_id, badge, position) "
+                "SELECT '1', artist_id, ?, ? FROM artists WHERE name=?",
+                (badge, pos, name),
+            )
+        await db.execute(
+            "INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES('2', 1, 7)"
+        )
+        choice = app_commands.Choice(name="Badge", value="badge")
+        await ProfileCog.sortartists.callback(cog, interaction, choice, None)
+        rows = await db.fetch_all(
+            "SELECT ufa.user_id, a.name, ufa.position FROM user_fav_artists ufa "
+            "JOIN artists a ON a.artist_id = ufa.artist_id ORDER BY ufa.user_id, ufa.position"
+        )
+        return [tuple(r) for r in rows]
+
+    assert run(scenario) == [
+        ("1", "Dido", 1),
+        ("1", "Blur", 2),
+        ("1", "Cher", 3),
+        ("1", "abba", 4),
+        ("2", "abba", 7),
+    ]
+
+
+def test_setbadge_returns_the_artist_name(temp_db):
+    import types
+    import discord
+    from discord import app_commands
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1), response=DummyResponse()
+    )
+    gold = app_commands.Choice(name="Gold", value="Gold")
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        await db.execute("INSERT INTO artists(artist_id, name) VALUES(1, 'Blur'), (2, 'Oasis')")
+        await db.execute(
+            "INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES('1', 1, 1)"
+        )
+        await ProfileCog.setbadge.callback(cog, interaction, "1", gold)
+        first = interaction.response.message
+        await ProfileCog.setbadge.callback(cog, interaction, "2", gold)
+        row = await db.fetch_one("SELECT badge FROM user_fav_artists WHERE artist_id=1")
+        return first, interaction.response.message, row["badge"]
+
+    assert run(scenario) == (
+        "✅ Badge **Gold** set for **Blur**.",
+        "This artist is not in your favourites.",
+        "Gold",
+    )
+
+
+def test_delartist_returns_name_and_closes_the_gap(temp_db):
+    import types
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1), response=DummyResponse()
+    )
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        await db.execute("INSERT INTO artists(artist_id, name) VALUES(1, 'Blur'), (2, 'Oasis')")
+        await db.execute(
+            "INSERT INTO user_fav_artists(user_id, artist_id, position) VALUES('1', 1, 1), ('1', 2, 2)"
+        )
+        await ProfileCog.delartist.callback(cog, interaction, "1")
+        rows = await db.fetch_all("SELECT artist_id, position FROM user_fav_artists")
+        return interaction.response.message, [tuple(r) for r in rows]
+
+    assert run(scenario) == ("✅ Favorite artist removed: **Blur**.", [(2, 1)])
+
+
+def test_profile_counts_whole_lists_and_epic_index_covers_order(temp_db):
+    import types
+    import discord
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        async def send_message(self, message=None, **kwargs):
+            self.kwargs = kwargs
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1, display_name="User1"), response=DummyResponse()
+    )
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        for pos in range(1, 21):
+            await spotify.upsert_track(f"t{pos}", f"Song{pos}", "Artist", "u")
+            await db.execute(
+                "INSERT INTO user_epics(user_id, track_id, epic_number, position) VALUES('1',?,1,?)",
+                (f"t{pos}", pos),
+            )
+        await ProfileCog.profile.callback(cog, interaction, None)
+        columns = await db.fetch_all("PRAGMA index_info(idx_user_epics_user_pos)")
+        return [r["name"] for r in columns]
+
+    columns = run(scenario)
+    embed = interaction.response.kwargs["embed"]
+    epics = next(f for f in embed.fields if f.name.startswith("💎 Epics"))
+    assert epics.name == "💎 Epics (20)"
+    assert epics.value.splitlines()[0] == "Artist – Song1 #1"
+    assert epics.value.endswith("… 5 more")
+    assert columns == ["user_id", "position", "epic_number"]
+
+
+def test_readers_see_commits_and_cannot_write(temp_db, monkeypatch):
+    import sqlite3
+
+    monkeypatch.setattr(db, "READ_POOL_SIZE", 2)
+
+    async def scenario():
+        await db.init_db()
+        await db.execute("INSERT INTO users(user_id) VALUES('1')")
+        # More concurrent reads than readers: they queue for a free connection
+        counts = await asyncio.gather(
+            *(db.read_one("SELECT COUNT(*) AS n FROM users") for _ in range(5))
+        )
+        try:
+            await db.read_all("INSERT INTO users(user_id) VALUES('2')")
+        except sqlite3.OperationalError:
+            refused = True
+        else:
+            refused = False
+        async with db.transaction():
+            await db.execute("INSERT INTO users(user_id) VALUES('3')")
+            own = await db.read_all("SELECT user_id FROM users ORDER BY user_id")
+        return [r["n"] for r in counts], refused, [r["user_id"] for r in own], len(db._readers)
+
+    counts, refused, own, readers = run(scenario)
+    assert counts == [1] * 5
+    assert refused
+    assert own == ["1", "3"]
+    assert readers == 2
+
+
+def test_addartist_upsert_keeps_position_and_badge(temp_db, monkeypatch):
+    import types
+    import discord
+    from discord import app_commands
+    from discord.ext import commands
+    from cogs.profile import ProfileCog
+    from core import spotify
+
+    class DummyResponse:
+        async def send_message(self, message=None, **kwargs):
+            self.message = message
+
+    cog = ProfileCog(commands.Bot(command_prefix="!", intents=discord.Intents.none()))
+    interaction = types.SimpleNamespace(
+        user=types.SimpleNamespace(id=1), response=DummyResponse()
+    )
+    gold = app_commands.Choice(name="Gold", value="Gold")
+
+    async def state():
+        rows = await db.fetch_all(
+            "SELECT a.name, ufa.badge, ufa.position FROM user_fav_artists ufa "
+            "JOIN artists a ON a.artist_id = ufa.artist_id ORDER BY ufa.position"
+        )
+        return [tuple(r) for r in rows]
+
+    async def canonical(name):
+        return {"name": name.title()}
+
+    monkeypatch.setattr(spotify, "get_canonical_artist", canonical)
+
+    async def scenario():
+        await db.init_db()
+        seen = []
+        await ProfileCog.addartist.callback(cog, interaction, "blur", gold)
+        await ProfileCog.addartist.callback(cog, interaction, "Oasis", None)
+        seen.append(await state())
+        await ProfileCog.addartist.callback(cog, interaction, "Blur", None)
+        seen.append(await state())
+        return seen
+
+    assert run(scenario) == [
+        [("Oasis", None, 1), ("Blur", "Gold", 2)],
+        [("Oasis", None, 1), ("Blur", "Gold", 2)],
+    ]
+
+
+def test_tracks_version_moves_only_after_commit(temp_db):
+    from core import spotify
+
+    async def scenario():
+        await db.init_db()
+        start = spotify.tracks_version
+        seen = []
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await spotify.upsert_track("t1", "Song", "Artist", "u")
+                raise RuntimeError("rolled back")
+        seen.append(spotify.tracks_version - start)
+        async with db.transaction():
+            await spotify.upsert_track("t1", "Song", "Artist", "u")
+            seen.append(spotify.tracks_version - start)
+        seen.append(spotify.tracks_version - start)
+        await spotify.upsert_track("t2", "Other", "Artist", "u")
+        seen.append(spotify.tracks_version - start)
+        return seen
+
+    assert run(scenario) == [0, 0, 1, 2]
+
+
+def test_failed_migration_is_rolled_back(temp_db, monkeypatch, tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    (migrations / "001_ok.sql").write_text("CREATE TABLE a (x INTEGER);")
+    (migrations / "002_broken.sql").write_text(
+        "CREATE TABLE b (x INTEGER);\nINSERT INTO missing VALUES (1);"
+    )
+    monkeypatch.setattr(db, "MIGRATIONS_DIR", migrations)
+
+    async def scenario():
+        with pytest.raises(Exception):
+            await db.init_db()
+        version = await db.fetch_one("PRAGMA user_version")
+        tables = await db.fetch_all("SELECT name FROM sqlite_master WHERE type='table'")
+        # Fixing the script lets the migration run again from scratch
+        (migrations / "002_broken.sql").write_text("CREATE TABLE b (x INTEGER);")
+        await db.init_db()
+        retried = await db.fetch_one("PRAGMA user_version")
+        return version[0], {r["name"] for r in tables}, retried[0]
+
+    assert run(scenario) == (1, {"a"}, 2)
+
+
+def test_cancelled_statement_does_not_leave_a_transaction_open(temp_db):
+    async def scenario():
+        await db.init_db()
+        with pytest.raises(asyncio.CancelledError):
+            async with db._statement() as conn:
+                await conn.execute("INSERT INTO users(user_id) VALUES('1')")
+                raise asyncio.CancelledError
+        async with db.transaction():
+            await db.execute("INSERT INTO users(user_id) VALUES('2')")
+        rows = await db.fetch_all("SELECT user_id FROM users ORDER BY user_id")
+        return [r["user_id"] for r in rows]
+
+    assert run(scenario) == ["2"]
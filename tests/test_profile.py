@@ -15,8 +15,9 @@ os.environ.setdefault("DISCORD_TOKEN", "test-token")
 os.environ.setdefault("SPOTIFY_CLIENT_ID", "cid")
 os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "csecret")
 
-from cogs.profile import ProfileCog, BADGE_EMOJIS
+from cogs.profile import ProfileCog, BADGE_EMOJIS, _fts_prefix_query
 from core import spotify, db
+from core.util import TTLCache
 
 
 class DummyResponse:
@@ -52,6 +53,41 @@ def test_addepic_rejects_non_positive_number(monkeypatch):
     asyncio.run(bot.close())
 
 
+def test_addwish_defers_before_spotify_lookup(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    events = []
+
+    class DeferringResponse(DummyResponse):
+        def is_done(self):
+            return "defer" in events
+
+        async def defer(self, **kwargs):
+            events.append("defer")
+
+    class DeferringInteraction(DummyInteraction):
+        def __init__(self):
+            super().__init__()
+            self.response = DeferringResponse()
+
+        async def edit_original_response(self, **kwargs):
+            events.append(kwargs["content"])
+
+    async def dummy_get_track(track):
+        events.append("get_track")
+        return None
+
+    monkeypatch.setattr(spotify, "get_track", dummy_get_track)
+
+    interaction = DeferringInteraction()
+    asyncio.run(ProfileCog.addwish.callback(cog, interaction, "abc", None))
+    assert events == ["defer", "get_track", "Song not found."]
+    assert interaction.response.message is None
+    asyncio.run(bot.close())
+
+
 def test_addepic_inserts_epic(monkeypatch):
     intents = discord.Intents.none()
     bot = commands.Bot(command_prefix="!", intents=intents)
@@ -64,29 +100,32 @@ def test_addepic_inserts_epic(monkeypatch):
         pass
 
     async def dummy_fetch_one(*args, **kwargs):
-        return None
+        dummy_fetch_one.query = args[0]
+        return {"position": 0}
 
     async def dummy_execute(*args, **kwargs):
         dummy_execute.called = True
 
     dummy_execute.called = False
 
-    async def dummy_get_next_position(self, uid):
-        return 1
-
     async def dummy_ensure_user(self, uid):
         pass
 
+    @asynccontextmanager
+    async def dummy_transaction():
+        yield
+
     monkeypatch.setattr(spotify, "get_track", dummy_get_track)
     monkeypatch.setattr(spotify, "upsert_track", dummy_upsert_track)
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
     monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(ProfileCog, "get_next_position", dummy_get_next_position)
+    monkeypatch.setattr(db, "transaction", dummy_transaction)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
     asyncio.run(ProfileCog.addepic.callback(cog, interaction, "abc", 5))
 
+    assert "INSERT INTO user_epics" in dummy_fetch_one.query
     assert dummy_execute.called
     assert "✅ Epic added" in interaction.response.message
     asyncio.run(bot.close())
@@ -104,20 +143,33 @@ def test_addepic_rejects_duplicate_song(monkeypatch):
         pass
 
     async def dummy_fetch_one(*args, **kwargs):
-        return 1
+        # ON CONFLICT DO NOTHING RETURNING yields no row for duplicates
+        return None
+
+    async def dummy_execute(*args, **kwargs):
+        dummy_execute.called = True
+
+    dummy_execute.called = False
 
     async def dummy_ensure_user(self, uid):
         pass
 
+    @asynccontextmanager
+    async def dummy_transaction():
+        yield
+
     monkeypatch.setattr(spotify, "get_track", dummy_get_track)
     monkeypatch.setattr(spotify, "upsert_track", dummy_upsert_track)
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "execute", dummy_execute)
+    monkeypatch.setattr(db, "transaction", dummy_transaction)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
     asyncio.run(ProfileCog.addepic.callback(cog, interaction, "abc", 5))
 
     assert interaction.response.message == "You already own an Epic for this song."
+    assert not dummy_execute.called
     asyncio.run(bot.close())
 
 
@@ -126,11 +178,12 @@ def test_delepic_deletes_epic(monkeypatch):
     bot = commands.Bot(command_prefix="!", intents=intents)
     cog = ProfileCog(bot)
 
+    executed = []
+
     async def dummy_fetch_one(query, params):
+        executed.append((query, params))
         return {"position": 2}
 
-    executed = []
-
     async def dummy_execute(query, params):
         executed.append((query, params))
 
@@ -145,6 +198,7 @@ def test_delepic_deletes_epic(monkeypatch):
     interaction = DummyInteraction()
     asyncio.run(ProfileCog.delepic.callback(cog, interaction, "t1"))
 
+    assert len(executed) == 1
     assert executed[0][0].startswith("DELETE")
     assert interaction.response.message == "✅ Epic removed."
     asyncio.run(bot.close())
@@ -181,8 +235,8 @@ def test_addwish_inserts_song(monkeypatch):
     async def dummy_upsert_track(*args, **kwargs):
         pass
 
-    async def dummy_fetch_one(*args, **kwargs):
-        return None
+    async def dummy_fetch_one(query, params):
+        return {"position": 0}
 
     async def dummy_execute(*args, **kwargs):
         dummy_execute.called = True
@@ -192,10 +246,15 @@ def test_addwish_inserts_song(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
+    @asynccontextmanager
+    async def dummy_transaction():
+        yield
+
     monkeypatch.setattr(spotify, "get_track", dummy_get_track)
     monkeypatch.setattr(spotify, "upsert_track", dummy_upsert_track)
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
     monkeypatch.setattr(db, "execute", dummy_execute)
+    monkeypatch.setattr(db, "transaction", dummy_transaction)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
@@ -206,6 +265,48 @@ def test_addwish_inserts_song(monkeypatch):
     asyncio.run(bot.close())
 
 
+def test_addwish_updates_note_of_existing_wish(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def dummy_get_track(track):
+        return {"track_id": "t1", "title": "Song", "artist_name": "Artist", "url": "u"}
+
+    async def dummy_upsert_track(*args, **kwargs):
+        pass
+
+    async def dummy_fetch_one(query, params):
+        assert "ON CONFLICT(user_id, track_id) DO UPDATE" in query
+        return {"position": 3}
+
+    async def dummy_execute(*args, **kwargs):
+        dummy_execute.called = True
+
+    dummy_execute.called = False
+
+    async def dummy_ensure_user(self, uid):
+        pass
+
+    @asynccontextmanager
+    async def dummy_transaction():
+        yield
+
+    monkeypatch.setattr(spotify, "get_track", dummy_get_track)
+    monkeypatch.setattr(spotify, "upsert_track", dummy_upsert_track)
+    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "execute", dummy_execute)
+    monkeypatch.setattr(db, "transaction", dummy_transaction)
+    monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
+
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.addwish.callback(cog, interaction, "abc", "mint"))
+
+    assert not dummy_execute.called
+    assert interaction.response.message == "Wishlist note updated."
+    asyncio.run(bot.close())
+
+
 def test_addartist_sets_badge(monkeypatch):
     intents = discord.Intents.none()
     bot = commands.Bot(command_prefix="!", intents=intents)
@@ -214,42 +315,70 @@ def test_addartist_sets_badge(monkeypatch):
     async def dummy_get_canonical_artist(artist):
         return {"name": "Artist"}
 
+    calls = []
+
     async def dummy_fetch_one(query, params):
-        if "SELECT artist_id" in query:
+        if "INSERT INTO artists" in query:
             return {"artist_id": 1}
-        return None
-
-    async def dummy_execute(query, params):
-        if "user_fav_artists" in query:
-            dummy_execute.called = True
-            dummy_execute.query = query
-            dummy_execute.params = params
-
-    dummy_execute.called = False
+        calls.append((query, params))
+        return {"position": 0}
 
     async def dummy_get_next_artist_position(self, uid):
+        dummy_get_next_artist_position.called = True
         return 1
 
+    dummy_get_next_artist_position.called = False
+
     async def dummy_ensure_user(self, uid):
         pass
 
+    @asynccontextmanager
+    async def dummy_transaction():
+        yield
+
     monkeypatch.setattr(spotify, "get_canonical_artist", dummy_get_canonical_artist)
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "execute", dummy_execute)
     monkeypatch.setattr(ProfileCog, "get_next_artist_position", dummy_get_next_artist_position)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
+    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
     badge_choice = app_commands.Choice(name="Gold", value="Gold")
     asyncio.run(ProfileCog.addartist.callback(cog, interaction, "Artist", badge_choice))
 
-    assert dummy_execute.called
-    assert "badge" in dummy_execute.query
-    assert dummy_execute.params[2] == "Gold"
+    assert len(calls) == 1
+    assert "ON CONFLICT(user_id, artist_id)" in calls[0][0]
+    assert calls[0][1] == ("1", 1, "Gold")
+    assert dummy_get_next_artist_position.called
     assert "Gold" in interaction.response.message
     asyncio.run(bot.close())
 
 
+def test_addartist_rejects_unverified_local_artist(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def dummy_get_canonical_artist(artist):
+        return None  # only stored raw by favartistcurrent
+
+    async def dummy_fetch_one(query, params):
+        raise AssertionError("nothing may be written")
+
+    async def dummy_ensure_user(self, uid):
+        pass
+
+    monkeypatch.setattr(spotify, "get_canonical_artist", dummy_get_canonical_artist)
+    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+    monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
+
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.addartist.callback(cog, interaction, "Local Band", None))
+
+    assert interaction.response.message == "Artist not found on Spotify."
+    asyncio.run(bot.close())
+
+
 def test_profile_shows_badge_with_emoji(monkeypatch):
     intents = discord.Intents.none()
     bot = commands.Bot(command_prefix="!", intents=intents)
@@ -260,53 +389,80 @@ def test_profile_shows_badge_with_emoji(monkeypatch):
 
     async def dummy_fetch_all(query, params=()):
         if "user_fav_artists" in query:
-            return [{"name": "Artist", "badge": "Gold"}]
+            return [{"name": "Artist", "badge": "Gold", "total": 1}]
         return []
 
     async def dummy_ensure_user(self, uid):
         pass
 
-    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "read_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
     asyncio.run(ProfileCog.profile.callback(cog, interaction, None))
     embed = interaction.response.kwargs["embed"]
     field = next(f for f in embed.fields if f.name.startswith("🌟 Favorite Artists"))
+    assert field.name == "🌟 Favorite Artists (1)"
     assert field.value == f"Artist — {BADGE_EMOJIS['Gold']} Gold"
     asyncio.run(bot.close())
 
 
-def test_setbadge_updates_existing(monkeypatch):
+def test_profile_uses_total_for_more_suffix(monkeypatch):
     intents = discord.Intents.none()
     bot = commands.Bot(command_prefix="!", intents=intents)
     cog = ProfileCog(bot)
 
-    async def dummy_fetch_one(query, params):
-        if "FROM user_fav_artists" in query:
-            return {"name": "Artist"}
+    async def dummy_fetch_one(query, params=()):
         return None
 
-    async def dummy_execute(query, params):
-        dummy_execute.called = True
-        dummy_execute.params = params
-
-    dummy_execute.called = False
+    async def dummy_fetch_all(query, params=()):
+        if "user_epics" in query:
+            assert "LIMIT 16" in query
+            return [
+                {"line": f"Artist – Song{i} #{i}", "total": 40}
+                for i in range(1, 17)
+            ]
+        return []
 
     async def dummy_ensure_user(self, uid):
         pass
 
-    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "execute", dummy_execute)
+    monkeypatch.setattr(db, "read_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.profile.callback(cog, interaction, None))
+    embed = interaction.response.kwargs["embed"]
+    field = next(f for f in embed.fields if f.name.startswith("💎 Epics"))
+    assert field.name == "💎 Epics (40)"
+    assert len(field.value.split("\n")) == 16
+    assert field.value.endswith("… 25 more")
+    asyncio.run(bot.close())
+
+
+def test_setbadge_updates_existing(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def dummy_fetch_one(query, params):
+        calls.append((query, params))
+        return {"name": "Artist"}
+
+    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+
     interaction = DummyInteraction()
     badge_choice = app_commands.Choice(name="Gold", value="Gold")
     asyncio.run(ProfileCog.setbadge.callback(cog, interaction, "1", badge_choice))
 
-    assert dummy_execute.called
-    assert "Gold" in interaction.response.message
+    assert len(calls) == 1
+    assert "UPDATE user_fav_artists SET badge" in calls[0][0]
+    assert calls[0][1] == ("Gold", "1", 1)
+    assert interaction.response.message == "✅ Badge **Gold** set for **Artist**."
     asyncio.run(bot.close())
 
 
@@ -318,23 +474,12 @@ def test_setbadge_rejects_non_favorite(monkeypatch):
     async def dummy_fetch_one(query, params):
         return None
 
-    async def dummy_execute(query, params):
-        dummy_execute.called = True
-
-    dummy_execute.called = False
-
-    async def dummy_ensure_user(self, uid):
-        pass
-
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
     badge_choice = app_commands.Choice(name="Gold", value="Gold")
     asyncio.run(ProfileCog.setbadge.callback(cog, interaction, "1", badge_choice))
 
-    assert not dummy_execute.called
     assert interaction.response.message == "This artist is not in your favourites."
     asyncio.run(bot.close())
 
@@ -347,30 +492,22 @@ def test_sortartists_by_name(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
-    async def dummy_fetch_all(query, params):
-        dummy_fetch_all.query = query
-        return [{"artist_id": 2}, {"artist_id": 1}]
+    calls = []
 
-    updates = []
-
-    async def dummy_execute(query, params):
-        updates.append(params)
-
-    @asynccontextmanager
-    async def dummy_transaction():
-        yield
+    async def dummy_execute(query, params=()):
+        calls.append((query, params))
 
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
     monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
     choice = app_commands.Choice(name="Name", value="name")
     asyncio.run(ProfileCog.sortartists.callback(cog, interaction, choice, None))
 
-    assert "ORDER BY a.name" in dummy_fetch_all.query
-    assert updates == [(1, "1", 2), (2, "1", 1)]
+    assert len(calls) == 1
+    query, params = calls[0]
+    assert "ROW_NUMBER() OVER (ORDER BY a.name COLLATE NOCASE" in query
+    assert params == ("1",)
     assert interaction.response.message == "✅ Favorite artists sorted alphabetically."
     asyncio.run(bot.close())
 
@@ -383,30 +520,22 @@ def test_sortartists_by_badge(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
-    async def dummy_fetch_all(query, params):
-        dummy_fetch_all.query = query
-        return [{"artist_id": 2}, {"artist_id": 1}]
+    calls = []
 
-    updates = []
-
-    async def dummy_execute(query, params):
-        updates.append(params)
-
-    @asynccontextmanager
-    async def dummy_transaction():
-        yield
+    async def dummy_execute(query, params=()):
+        calls.append((query, params))
 
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
     monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
     choice = app_commands.Choice(name="Badge", value="badge")
     asyncio.run(ProfileCog.sortartists.callback(cog, interaction, choice, None))
 
-    assert "ORDER BY CASE ufa.badge" in dummy_fetch_all.query
-    assert updates == [(1, "1", 2), (2, "1", 1)]
+    assert len(calls) == 1
+    query, params = calls[0]
+    assert "ROW_NUMBER() OVER (ORDER BY CASE ufa.badge" in query
+    assert params == ("1",)
     assert interaction.response.message == "✅ Favorite artists sorted by badge."
     asyncio.run(bot.close())
 
@@ -419,30 +548,22 @@ def test_sortepics_by_name(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
-    async def dummy_fetch_all(query, params):
-        dummy_fetch_all.query = query
-        return [{"track_id": "b", "epic_number": 2}, {"track_id": "a", "epic_number": 1}]
-
-    updates = []
+    calls = []
 
-    async def dummy_execute(query, params):
-        updates.append(params)
-
-    @asynccontextmanager
-    async def dummy_transaction():
-        yield
+    async def dummy_execute(query, params=()):
+        calls.append((query, params))
 
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
     monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
     choice = app_commands.Choice(name="Name", value="name")
     asyncio.run(ProfileCog.sortepics.callback(cog, interaction, choice, None))
 
-    assert "ORDER BY t.artist_name" in dummy_fetch_all.query
-    assert updates == [(1, "1", "b", 2), (2, "1", "a", 1)]
+    assert len(calls) == 1
+    query, params = calls[0]
+    assert "ROW_NUMBER() OVER (ORDER BY t.artist_name" in query
+    assert params == ("1",)
     assert interaction.response.message == "✅ Epics sorted alphabetically."
     asyncio.run(bot.close())
 
@@ -455,30 +576,22 @@ def test_sortwishes_by_name(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
-    async def dummy_fetch_all(query, params):
-        dummy_fetch_all.query = query
-        return [{"track_id": "b"}, {"track_id": "a"}]
-
-    updates = []
-
-    async def dummy_execute(query, params):
-        updates.append(params)
+    calls = []
 
-    @asynccontextmanager
-    async def dummy_transaction():
-        yield
+    async def dummy_execute(query, params=()):
+        calls.append((query, params))
 
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
     monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
     choice = app_commands.Choice(name="Name", value="name")
     asyncio.run(ProfileCog.sortwishes.callback(cog, interaction, choice, None))
 
-    assert "ORDER BY t.artist_name" in dummy_fetch_all.query
-    assert updates == [(1, "1", "b"), (2, "1", "a")]
+    assert len(calls) == 1
+    query, params = calls[0]
+    assert "ROW_NUMBER() OVER (ORDER BY t.artist_name" in query
+    assert params == ("1",)
     assert interaction.response.message == "✅ Wishlist sorted alphabetically."
     asyncio.run(bot.close())
 
@@ -492,7 +605,7 @@ def test_autocomplete_owned_tracks(monkeypatch):
         assert params[0] == "1"
         return [{"track_id": "t1", "title": "Song", "artist_name": "Artist"}]
 
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
 
     interaction = DummyInteraction()
     choices = asyncio.run(ProfileCog.autocomplete_owned_tracks(cog, interaction, ""))
@@ -511,7 +624,7 @@ def test_autocomplete_wishlist_tracks(monkeypatch):
         assert params[0] == "1"
         return [{"track_id": "t2", "title": "Wish", "artist_name": "Band"}]
 
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
 
     interaction = DummyInteraction()
     choices = asyncio.run(ProfileCog.autocomplete_wishlist_tracks(cog, interaction, ""))
@@ -537,7 +650,7 @@ def test_autocomplete_owned_epics(monkeypatch):
             }
         ]
 
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
 
     interaction = DummyInteraction()
     choices = asyncio.run(ProfileCog.autocomplete_owned_epics(cog, interaction, ""))
@@ -552,29 +665,421 @@ def test_delartist_deletes_artist(monkeypatch):
     bot = commands.Bot(command_prefix="!", intents=intents)
     cog = ProfileCog(bot)
 
+    calls = []
+
+    async def dummy_fetch_one(query, params):
+        calls.append((query, params))
+        return {"name": "Artist"}
+
+    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.delartist.callback(cog, interaction, "5"))
+
+    assert len(calls) == 1
+    assert calls[0][0].strip().startswith("DELETE FROM user_fav_artists")
+    assert calls[0][1] == ("1", 5)
+    assert interaction.response.message == "✅ Favorite artist removed: **Artist**."
+    asyncio.run(bot.close())
+
+
+def test_fts_prefix_query_quotes_words():
+    assert _fts_prefix_query('hotline "bling') == '"hotline"* """bling"*'
+    assert _fts_prefix_query("   ") == ""
+
+
+def test_autocomplete_tracks_skips_single_char(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def fail_fetch_all(query, params):
+        raise AssertionError("database should not be queried")
+
+    monkeypatch.setattr(db, "fetch_all", fail_fetch_all)
+
+    interaction = DummyInteraction()
+    assert asyncio.run(cog.autocomplete_tracks(interaction, " a ")) == []
+    asyncio.run(bot.close())
+
+
+def test_sortepics_manual_moves_through_move_view(monkeypatch):
+    from cogs.profile import MoveView
+
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    windows = [
+        [
+            {"position": 2, "is_current": 0, "line": "B – Two #2"},
+            {"position": 3, "is_current": 1, "line": "C – Three #3"},
+        ],
+        [
+            {"position": 1, "is_current": 0, "line": "A – One #1"},
+            {"position": 2, "is_current": 1, "line": "C – Three #3"},
+            {"position": 3, "is_current": 0, "line": "B – Two #2"},
+        ],
+    ]
+
+    async def dummy_fetch_all(query, params):
+        assert params == ("1", "t3")
+        return windows.pop(0)
+
+    moves = []
+
+    async def dummy_move_epic_to(self, user_id, track_id, epic_number, new_pos):
+        moves.append((track_id, epic_number, new_pos))
+        return new_pos
+
     async def dummy_ensure_user(self, uid):
         pass
 
-    async def dummy_fetch_one(query, params):
-        return {"position": 2, "name": "Artist"}
+    class EditResponse:
+        async def edit_message(self, content=None, view=None):
+            self.content = content
 
-    executed = []
+    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(ProfileCog, "move_epic_to", dummy_move_epic_to)
+    monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
-    async def dummy_execute(query, params):
-        executed.append((query, params))
+    interaction = DummyInteraction()
+    mode = app_commands.Choice(name="Manual", value="manual")
+    asyncio.run(ProfileCog.sortepics.callback(cog, interaction, mode, "t3|3"))
+    assert interaction.response.message == "2. B – Two #2\n3. **C – Three #3**\n4. —"
+    view = interaction.response.kwargs["view"]
+    assert isinstance(view, MoveView)
+
+    click = types.SimpleNamespace(response=EditResponse())
+    asyncio.run(view.move_up.callback(click))
+    assert moves == [("t3", 3, 2)]
+    assert click.response.content == "1. A – One #1\n2. **C – Three #3**\n3. B – Two #2"
+    asyncio.run(bot.close())
 
-    @asynccontextmanager
-    async def dummy_transaction():
-        yield
+
+def test_owned_tracks_autocomplete_binds_pattern_once(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    captured = {}
+
+    async def dummy_fetch_all(query, params):
+        captured["query"] = query
+        captured["params"] = params
+        return [{"track_id": "t1", "title": "Song", "artist_name": "Artist"}]
+
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
+
+    choices = asyncio.run(cog.autocomplete_owned_tracks(DummyInteraction(), "  son "))
+    assert captured["params"] == ("1", "%son%")
+    assert "LIKE ?2 ESCAPE '\\' OR t.artist_name LIKE ?2 ESCAPE '\\'" in captured["query"]
+    assert choices[0].value == "t1"
+    asyncio.run(bot.close())
+
+
+def test_list_autocomplete_is_cached_until_lists_change(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def dummy_fetch_all(query, params):
+        calls.append(params)
+        return [{"track_id": "t1", "title": "Song", "artist_name": "Artist"}]
+
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
+
+    interaction = DummyInteraction()
+    first = asyncio.run(cog.autocomplete_wishlist_tracks(interaction, "so"))
+    second = asyncio.run(cog.autocomplete_wishlist_tracks(interaction, "so "))
+    assert first == second
+    assert len(calls) == 1
+
+    cog._touch_lists("1")
+    asyncio.run(cog.autocomplete_wishlist_tracks(interaction, "so"))
+    assert len(calls) == 2
+    asyncio.run(bot.close())
+
+
+def test_spotify_autocomplete_drops_superseded_keystrokes(monkeypatch):
+    from cogs import profile
+
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    searched = []
+
+    async def dummy_search_artists(query, limit=10):
+        searched.append(query)
+        return [{"id": "a1", "name": query.title()}]
+
+    monkeypatch.setattr(spotify, "search_artists", dummy_search_artists)
+    monkeypatch.setattr(profile, "SPOTIFY_DEBOUNCE_SECONDS", 0.01)
+
+    async def scenario():
+        interaction = DummyInteraction()
+        stale = asyncio.create_task(cog.autocomplete_artists(interaction, "dra"))
+        await asyncio.sleep(0)
+        latest = await cog.autocomplete_artists(interaction, "drake")
+        with pytest.raises(asyncio.CancelledError):
+            await stale
+        again = await cog.autocomplete_artists(interaction, "DRAKE")
+        return latest, again
+
+    latest, again = asyncio.run(scenario())
+    assert [c.value for c in latest] == ["Drake"]
+    assert again == latest
+    assert searched == ["drake"]
+    asyncio.run(bot.close())
+
+
+def test_spotify_autocomplete_gives_up_on_slow_searches(monkeypatch):
+    from cogs import profile
+
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def slow_search_tracks(query, limit=5):
+        calls.append(query)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return [{"track_id": "t1", "title": "Song", "artist_name": "Artist"}]
+
+    monkeypatch.setattr(spotify, "search_tracks", slow_search_tracks)
+    monkeypatch.setattr(profile, "SPOTIFY_DEBOUNCE_SECONDS", 0)
+    monkeypatch.setattr(profile, "SPOTIFY_AUTOCOMPLETE_TIMEOUT", 0.01)
+
+    interaction = DummyInteraction()
+    assert asyncio.run(cog.autocomplete_spotify_tracks(interaction, "song")) == []
+    # The timed-out search was not cached
+    retry = asyncio.run(cog.autocomplete_spotify_tracks(interaction, "song"))
+    assert [c.value for c in retry] == ["t1"]
+    asyncio.run(bot.close())
+
+
+def test_spotify_autocompletes_skip_one_character_terms(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("Spotify should not be queried")
+
+    monkeypatch.setattr(spotify, "search_artists", fail)
+    monkeypatch.setattr(spotify, "search_tracks", fail)
+
+    interaction = DummyInteraction()
+    assert asyncio.run(cog.autocomplete_artists(interaction, " d ")) == []
+    assert asyncio.run(cog.autocomplete_spotify_tracks(interaction, "x")) == []
+    asyncio.run(bot.close())
+
+
+def test_badge_commands_share_prebuilt_choices():
+    from cogs import profile as profile_module
+
+    for command in (ProfileCog.addartist, ProfileCog.setbadge):
+        choices = command._params["badge"].choices
+        assert [c.value for c in choices] == profile_module.BADGES
+        assert all(a is b for a, b in zip(choices, profile_module._BADGE_CHOICES))
+
+
+def test_sortwishes_manual_checks_membership_with_the_view_query(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def dummy_ensure_user(self, uid):
+        pass
+
+    queries = []
+
+    async def dummy_fetch_all(query, params):
+        queries.append(query)
+        return []
+
+    async def dummy_fetch_one(query, params):
+        raise AssertionError("no separate position lookup expected")
 
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
+    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
     monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "execute", dummy_execute)
-    monkeypatch.setattr(db, "transaction", dummy_transaction)
 
     interaction = DummyInteraction()
-    asyncio.run(ProfileCog.delartist.callback(cog, interaction, "5"))
+    choice = app_commands.Choice(name="Manual", value="manual")
+    asyncio.run(ProfileCog.sortwishes.callback(cog, interaction, choice, "t1"))
 
-    assert executed[0][0].startswith("DELETE")
-    assert interaction.response.message == "✅ Favorite artist removed: **Artist**."
+    assert len(queries) == 1
+    assert interaction.response.message == "This wish is not in your wishlist."
+    asyncio.run(bot.close())
+
+
+def test_like_pattern_escapes_wildcards():
+    import sqlite3
+    from cogs.profile import _like_pattern
+
+    pattern = _like_pattern(" 100%_\\ ")
+    assert pattern == "%100\\%\\_\\\\%"
+    conn = sqlite3.connect(":memory:")
+    match = "SELECT ? LIKE ? ESCAPE '\\'"
+    assert conn.execute(match, ("Song 100%_\\ Mix", pattern)).fetchone()[0] == 1
+    assert conn.execute(match, ("Song 1000xx Mix", pattern)).fetchone()[0] == 0
+    conn.close()
+    assert _like_pattern("  ") is None
+
+
+def test_resolve_artist_is_memoised(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def dummy_get_canonical_artist(artist):
+        calls.append(("spotify", artist))
+        return {"name": "Daft Punk"} if artist == "daft" else None
+
+    async def dummy_fetch_one(query, params):
+        calls.append(("db", params[0]))
+        if "INSERT INTO artists" in query:
+            return {"artist_id": 7}
+        return None
+
+    monkeypatch.setattr(spotify, "get_canonical_artist", dummy_get_canonical_artist)
+    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
+
+    async def scenario():
+        first = await cog._resolve_artist("daft")
+        again = await cog._resolve_artist("DAFT ")
+        canonical = await cog._resolve_artist("daft punk")
+        unknown = await cog._resolve_artist("nobody")
+        kept = await cog._resolve_artist("nobody", trust_raw=True)
+        still_unknown = await cog._resolve_artist("nobody")
+        return first, again, canonical, unknown, kept, still_unknown
+
+    first, again, canonical, unknown, kept, still_unknown = asyncio.run(scenario())
+    assert first == again == canonical == ("Daft Punk", 7)
+    assert unknown is None
+    assert kept == ("nobody", 7)
+    # A raw name stored with trust_raw is not memoised as verified
+    assert still_unknown is None
+    assert calls[:2] == [("spotify", "daft"), ("db", "Daft Punk")]
+    assert ("spotify", "daft punk") not in calls
+    asyncio.run(bot.close())
+
+
+def test_ensure_user_writes_once_per_user(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def dummy_execute(query, params=()):
+        calls.append(params)
+
+    monkeypatch.setattr(db, "execute", dummy_execute)
+
+    async def scenario():
+        for uid in ("1", "2", "1", "1"):
+            await cog.ensure_user(uid)
+
+    asyncio.run(scenario())
+    assert calls == [("1",), ("2",)]
+    asyncio.run(bot.close())
+
+
+def test_ensure_user_memo_is_bounded(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+    cog._known_users = TTLCache(maxsize=2, ttl=60)
+
+    calls = []
+
+    async def dummy_execute(query, params=()):
+        calls.append(params)
+
+    monkeypatch.setattr(db, "execute", dummy_execute)
+
+    async def scenario():
+        for uid in ("1", "2", "3", "3", "1"):
+            await cog.ensure_user(uid)
+
+    asyncio.run(scenario())
+    # "1" was evicted by "3" and is written again
+    assert calls == [("1",), ("2",), ("3",), ("1",)]
+    assert len(cog._known_users) == 2
+    asyncio.run(bot.close())
+
+
+def test_ensure_user_retries_after_a_failed_insert(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    calls = []
+
+    async def dummy_execute(query, params=()):
+        calls.append(params)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(db, "execute", dummy_execute)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cog.ensure_user("1")
+        await cog.ensure_user("1")
+        await cog.ensure_user("1")
+
+    asyncio.run(scenario())
+    assert calls == [("1",), ("1",)]
+    asyncio.run(bot.close())
+
+
+def test_current_spotify_prefers_guild_member():
+    from cogs.profile import _current_spotify
+
+    playing = discord.Spotify(sync_id="t1", details="Song", state="Artist", session_id="s")
+    member = types.SimpleNamespace(activities=[discord.Game(name="Chess"), playing])
+    guild = types.SimpleNamespace(get_member=lambda uid: member if uid == 1 else None)
+    bare_user = types.SimpleNamespace(id=1, activities=[])
+
+    assert _current_spotify(types.SimpleNamespace(user=bare_user, guild=guild)) is playing
+    assert _current_spotify(types.SimpleNamespace(user=bare_user, guild=None)) is None
+
+
+def test_autocomplete_tracks_is_cached_until_tracks_change(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    queries = []
+
+    async def dummy_fetch_all(query, params):
+        queries.append(params)
+        return [{"track_id": "t1", "title": "Song", "artist_name": "Artist"}]
+
+    async def dummy_execute(query, params=()):
+        pass
+
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "execute", dummy_execute)
+
+    async def scenario():
+        first = await cog.autocomplete_tracks(DummyInteraction(1), "Dra")
+        await cog.autocomplete_tracks(DummyInteraction(2), "dra ")
+        await spotify.upsert_track("t2", "Other", "Artist", "u")
+        await cog.autocomplete_tracks(DummyInteraction(1), "Dra")
+        return first
+
+    first = asyncio.run(scenario())
+    assert [c.value for c in first] == ["t1"]
+    assert len(queries) == 2
     asyncio.run(bot.close())
@@ -0,0 +1,148 @@
+from pathlib import Path
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DISCORD_TOKEN", "test-token")
+os.environ.setdefault("SPOTIFY_CLIENT_ID", "cid")
+os.environ.setdefault("SPOTIFY_CLIENT_SECRET", "csecret")
+
+from core import spotify
+from core.util import TTLCache
+
+
+def test_get_canonical_artist_caches_case_insensitively(monkeypatch):
+    calls = []
+
+    async def dummy_search_artists(query, limit=10):
+        calls.append(query)
+        return [{"id": "a1", "name": "Drake"}]
+
+    monkeypatch.setattr(spotify, "search_artists", dummy_search_artists)
+    monkeypatch.setattr(spotify, "_canonical_artist_cache", TTLCache(maxsize=8, ttl=60))
+
+    first = asyncio.run(spotify.get_canonical_artist("drake"))
+    second = asyncio.run(spotify.get_canonical_artist(" DRAKE "))
+    assert first == second == {"id": "a1", "name": "Drake"}
+    assert calls == ["drake"]
+
+
+def test_get_canonical_artist_does_not_cache_misses(monkeypatch):
+    calls = []
+
+    async def dummy_search_artists(query, limit=10):
+        calls.append(query)
+        return []
+
+    monkeypatch.setattr(spotify, "search_artists", dummy_search_artists)
+    monkeypatch.setattr(spotify, "_canonical_artist_cache", TTLCache(maxsize=8, ttl=60))
+
+    assert asyncio.run(spotify.get_canonical_artist("nobody")) is None
+    assert asyncio.run(spotify.get_canonical_artist("nobody")) is None
+    assert calls == ["nobody", "nobody"]
+
+
+class DummyResponse:
+    status = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.data
+
+
+class DummySession:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return DummyResponse(self.data)
+
+
+def test_get_track_reuses_recent_search_results(monkeypatch):
+    item = {
+        "id": "t1",
+        "name": "Song",
+        "artists": [{"name": "Artist"}],
+        "external_urls": {"spotify": "u"},
+        "album": {"release_date": "2020-01-01"},
+    }
+    session = DummySession({"tracks": {"items": [item]}})
+
+    async def dummy_get_token():
+        return "token"
+
+    async def dummy_get_session():
+        return session
+
+    monkeypatch.setattr(spotify, "get_token", dummy_get_token)
+    monkeypatch.setattr(spotify, "_get_session", dummy_get_session)
+    monkeypatch.setattr(spotify, "_recent_tracks", TTLCache(maxsize=8, ttl=60))
+
+    results = asyncio.run(spotify.search_tracks("song"))
+    track = asyncio.run(spotify.get_track("t1"))
+    assert track == results[0]
+    assert track["year"] == "2020"
+    assert session.calls == 1
+
+
+def test_search_artists_caches_per_query_and_limit(monkeypatch):
+    item = {"id": "a1", "name": "Drake", "popularity": 90}
+    session = DummySession({"artists": {"items": [item]}})
+
+    async def dummy_get_token():
+        return "token"
+
+    async def dummy_get_session():
+        return session
+
+    monkeypatch.setattr(spotify, "get_token", dummy_get_token)
+    monkeypatch.setattr(spotify, "_get_session", dummy_get_session)
+    monkeypatch.setattr(spotify, "_artist_search_cache", TTLCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(spotify, "_canonical_artist_cache", TTLCache(maxsize=8, ttl=60))
+
+    first = asyncio.run(spotify.search_artists("drake"))
+    first.clear()  # callers get their own list
+    second = asyncio.run(spotify.search_artists(" DRAKE "))
+    assert second == [{"id": "a1", "name": "Drake", "popularity": 90}]
+    assert session.calls == 1
+    asyncio.run(spotify.search_artists("drake", limit=1))
+    assert session.calls == 2
+
+
+def test_search_artists_primes_canonical_lookup_for_offered_names(monkeypatch):
+    items = [
+        {"id": "a1", "name": "Drake", "popularity": 90},
+        {"id": "a2", "name": "Drake", "popularity": 5},
+        {"id": "a3", "name": "Dragonforce", "popularity": 60},
+    ]
+    session = DummySession({"artists": {"items": items}})
+
+    async def dummy_get_token():
+        return "token"
+
+    async def dummy_get_session():
+        return session
+
+    monkeypatch.setattr(spotify, "get_token", dummy_get_token)
+    monkeypatch.setattr(spotify, "_get_session", dummy_get_session)
+    monkeypatch.setattr(spotify, "_artist_search_cache", TTLCache(maxsize=8, ttl=60))
+    monkeypatch.setattr(spotify, "_canonical_artist_cache", TTLCache(maxsize=8, ttl=60))
+
+    asyncio.run(spotify.search_artists("dra"))
+    assert asyncio.run(spotify.get_canonical_artist("Drake"))["id"] == "a1"
+    assert asyncio.run(spotify.get_canonical_artist("dragonforce"))["id"] == "a3"
+    assert session.calls == 1
@@ -52,7 +52,8 @@ def test_username_command_updates_db(monkeypatch):
 
     asyncio.run(ProfileCog.username.callback(cog, interaction, "Player1"))
 
-    assert executed["params"] == ("Player1", "1")
+    assert executed["query"].strip().startswith("INSERT INTO users")
+    assert executed["params"] == ("1", "Player1")
     assert "Username set" in interaction.response.message
     assert interaction.response.kwargs.get("ephemeral") is True
     asyncio.run(bot.close())
@@ -100,8 +101,8 @@ def test_profile_shows_username(monkeypatch):
     async def dummy_ensure_user(self, uid):
         pass
 
-    monkeypatch.setattr(db, "fetch_one", dummy_fetch_one)
-    monkeypatch.setattr(db, "fetch_all", dummy_fetch_all)
+    monkeypatch.setattr(db, "read_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
     monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
 
     interaction = DummyInteraction()
@@ -112,3 +113,37 @@ def test_profile_shows_username(monkeypatch):
     assert interaction.response.kwargs.get("ephemeral") is True
     asyncio.run(bot.close())
 
+
+
+def test_profile_reuses_username_set_by_command(monkeypatch):
+    intents = discord.Intents.none()
+    bot = commands.Bot(command_prefix="!", intents=intents)
+    cog = ProfileCog(bot)
+
+    async def dummy_execute(query, params=()):
+        pass
+
+    async def dummy_fetch_one(query, params=()):
+        raise AssertionError("username should come from the cache")
+
+    async def dummy_fetch_all(query, params=()):
+        return []
+
+    async def dummy_ensure_user(self, uid):
+        pass
+
+    monkeypatch.setattr(db, "execute", dummy_execute)
+    monkeypatch.setattr(db, "read_one", dummy_fetch_one)
+    monkeypatch.setattr(db, "read_all", dummy_fetch_all)
+    monkeypatch.setattr(ProfileCog, "ensure_user", dummy_ensure_user)
+
+    asyncio.run(ProfileCog.username.callback(cog, DummyInteraction(), "Player1"))
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.profile.callback(cog, interaction, None))
+    assert interaction.response.kwargs["embed"].fields[0].value == "Player1"
+
+    asyncio.run(ProfileCog.delusername.callback(cog, DummyInteraction()))
+    interaction = DummyInteraction()
+    asyncio.run(ProfileCog.profile.callback(cog, interaction, None))
+    assert interaction.response.kwargs["embed"].fields[0].name != "👤 SM-Username"
+    asyncio.run(bot.close())
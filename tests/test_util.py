@@ -5,7 +5,8 @@ import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from core.util import chunked
+from core import util
+from core.util import chunked, TTLCache
 
 
 def test_chunked_splits_sequence_into_expected_sublists():
@@ -18,3 +19,26 @@ def test_chunked_splits_sequence_into_expected_sublists():
 def test_chunked_raises_value_error_for_non_positive_size(size):
     with pytest.raises(ValueError):
         list(chunked([1, 2, 3], size))
+
+
+def test_ttl_cache_returns_fresh_entries_and_evicts_lru():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(util.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    now[0] = 109.0
+    assert cache.get("a") == 1
+    now[0] = 110.0
+    assert cache.get("a") is None
+    assert len(cache) == 0